@@ -24,12 +24,13 @@ class DoublyLinkedList:
         if before is self._tail:
             self._tail = node
         self._length += 1
+        return node
 
     def addfirst(self, item):
-        self._addbetween(item, None, self._head)
+        return self._addbetween(item, None, self._head)
 
     def addlast(self, item):
-        self._addbetween(item, self._tail, None)
+        return self._addbetween(item, self._tail, None)
 
     def _remove(self, node):
         before, after = node.prev, node.link
@@ -5,3 +5,9 @@ from ds2.mapping.listmapping_notDRY import ListMapping as ListMapping_notDRY
 from ds2.mapping.hashmappingsimple import HashMappingSimple
 from ds2.mapping.hashmapping import HashMapping
 from ds2.mapping.hashmapping_notDRY import HashMapping as HashMapping_notDRY
+from ds2.mapping.openaddressmapping import OpenAddressMapping
+from ds2.mapping.incrementalhashmapping import IncrementalHashMapping
+from ds2.mapping.cachemapping import CacheMapping, EvictionPolicy, LRU, LFU, TTL
+from ds2.mapping.diskhashmapping import DiskHashMapping
+from ds2.mapping.concurrenthashmapping import ConcurrentHashMapping
+from ds2.mapping.cuckoomapping import CuckooMapping
@@ -0,0 +1,236 @@
+import time
+from ds2.mapping import Mapping, Entry, HashMapping
+from ds2.deque import DoublyLinkedList
+
+class CacheEntry(Entry):
+    def __init__(self, key, value, size):
+        Entry.__init__(self, key, value)
+        self.size = size
+        # The policy keeps its list node here.
+        self.node = None
+
+class EvictionPolicy:
+    # Child class needs to implement this!
+    def add(self, entry):
+        raise NotImplementedError
+
+    # Child class needs to implement this!
+    def discard(self, entry):
+        raise NotImplementedError
+
+    # Child class needs to implement this!
+    # Remove and return the entry that should be evicted next.
+    def pop(self):
+        raise NotImplementedError
+
+    # Called when the entry is read.
+    def touch(self, entry):
+        pass
+
+    # Called when the entry is overwritten.
+    def update(self, entry):
+        self.touch(entry)
+
+    def expired(self, entry):
+        return False
+
+    # Remove and return an expired entry, or None if there are none.
+    def popexpired(self):
+        return None
+
+class LRU(EvictionPolicy):
+    def __init__(self):
+        self._order = DoublyLinkedList()
+
+    def add(self, entry):
+        entry.node = self._order.addlast(entry)
+
+    def discard(self, entry):
+        self._order._remove(entry.node)
+
+    def pop(self):
+        return self._order.removefirst()
+
+    def touch(self, entry):
+        self.discard(entry)
+        self.add(entry)
+
+class _Frequency(DoublyLinkedList):
+    def __init__(self, count):
+        DoublyLinkedList.__init__(self)
+        self.count = count
+
+class LFU(EvictionPolicy):
+    def __init__(self):
+        # One list of entries for each access count, in increasing order.
+        # Within a list, the least recently used entry is first.
+        self._frequencies = DoublyLinkedList()
+
+    def _place(self, entry, freqnode):
+        entry.freqnode = freqnode
+        entry.node = freqnode.data.addlast(entry)
+
+    def add(self, entry):
+        first = self._frequencies._head
+        if first is None or first.data.count != 1:
+            first = self._frequencies.addfirst(_Frequency(1))
+        self._place(entry, first)
+
+    def discard(self, entry):
+        frequency = entry.freqnode.data
+        frequency._remove(entry.node)
+        if len(frequency) == 0:
+            self._frequencies._remove(entry.freqnode)
+
+    def pop(self):
+        frequency = self._frequencies._head.data
+        entry = frequency.removefirst()
+        if len(frequency) == 0:
+            self._frequencies.removefirst()
+        return entry
+
+    def touch(self, entry):
+        freqnode = entry.freqnode
+        count = freqnode.data.count + 1
+        nextnode = freqnode.link
+        if nextnode is None or nextnode.data.count != count:
+            nextnode = self._frequencies._addbetween(_Frequency(count),
+                                                     freqnode, nextnode)
+        self.discard(entry)
+        self._place(entry, nextnode)
+
+class TTL(EvictionPolicy):
+    def __init__(self, ttl, clock = time.monotonic):
+        self._ttl = ttl
+        self._clock = clock
+        # Every entry lives equally long, so this is also the expiry order.
+        self._order = DoublyLinkedList()
+
+    def add(self, entry):
+        entry.expires = self._clock() + self._ttl
+        entry.node = self._order.addlast(entry)
+
+    def discard(self, entry):
+        self._order._remove(entry.node)
+
+    def pop(self):
+        return self._order.removefirst()
+
+    def update(self, entry):
+        self.discard(entry)
+        self.add(entry)
+
+    def expired(self, entry):
+        return self._clock() >= entry.expires
+
+    def popexpired(self):
+        first = self._order._head
+        if first is not None and self.expired(first.data):
+            return self._order.removefirst()
+        return None
+
+class CacheMapping(Mapping):
+    def __init__(self, capacity = 1000, policy = None, sizeof = None):
+        self._capacity = capacity
+        self._policy = policy if policy is not None else LRU()
+        # With a sizeof function, the capacity is measured in its units
+        # (e.g. bytes) rather than in entries.
+        self._sizeof = sizeof
+        self._entries = HashMapping()
+        self._weight = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        try:
+            entry = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            raise
+        if self._policy.expired(entry):
+            self._policy.discard(entry)
+            self._forget(entry)
+            self.expirations += 1
+            self.misses += 1
+            raise KeyError
+        self.hits += 1
+        self._policy.touch(entry)
+        return entry.value
+
+    def put(self, key, value):
+        self._purge()
+        size = self._sizeof(value) if self._sizeof else 1
+        if size > self._capacity:
+            # The value can never fit, so it is not cached, and the old
+            # value for the key is dropped without evicting anything else.
+            if key in self._entries:
+                self.remove(key)
+            return
+        if key in self._entries:
+            entry = self._entries[key]
+            self._weight += size - entry.size
+            entry.value, entry.size = value, size
+            self._policy.update(entry)
+        else:
+            # Make room first, so the new entry is not the one evicted.
+            self._evict(size)
+            entry = CacheEntry(key, value, size)
+            self._entries[key] = entry
+            self._weight += size
+            self._policy.add(entry)
+        self._evict(0)
+
+    def remove(self, key):
+        entry = self._entries[key]
+        self._policy.discard(entry)
+        self._forget(entry)
+        if self._policy.expired(entry):
+            self.expirations += 1
+            raise KeyError
+
+    def __contains__(self, key):
+        # Membership tests do not count as accesses.
+        try:
+            entry = self._entries[key]
+        except KeyError:
+            return False
+        return not self._policy.expired(entry)
+
+    def contains_many(self, keys):
+        return [key in self for key in keys]
+
+    def __len__(self):
+        self._purge()
+        return len(self._entries)
+
+    def _entryiter(self):
+        self._purge()
+        return self._entries.values()
+
+    def _forget(self, entry):
+        self._entries.remove(entry.key)
+        self._weight -= entry.size
+
+    def _evict(self, room):
+        while self._weight + room > self._capacity and len(self._entries):
+            self._forget(self._policy.pop())
+            self.evictions += 1
+
+    def _purge(self):
+        entry = self._policy.popexpired()
+        while entry is not None:
+            self._forget(entry)
+            self.expirations += 1
+            entry = self._policy.popexpired()
+
+    def stats(self):
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'size': len(self._entries),
+                'weight': self._weight,
+                'capacity': self._capacity,
+                }
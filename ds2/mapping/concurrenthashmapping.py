@@ -0,0 +1,54 @@
+import threading
+from ds2.mapping import Mapping, HashMapping
+
+class ConcurrentHashMapping(Mapping):
+    def __init__(self, shards = 16, size = 100):
+        # The number of shards is always a power of two.
+        self._bits = (shards - 1).bit_length() if shards > 1 else 0
+        n = 1 << self._bits
+        self._shards = [HashMapping(size) for i in range(n)]
+        self._locks = [threading.Lock() for i in range(n)]
+
+    def _shard(self, key):
+        # Each shard picks its bucket from the low bits of the hash, so we
+        # pick the shard from the high bits of a scrambled copy of it.
+        scrambled = (hash(key) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        return scrambled >> (64 - self._bits)
+
+    def get(self, key):
+        i = self._shard(key)
+        with self._locks[i]:
+            return self._shards[i].get(key)
+
+    def _lookup(self, key, default):
+        i = self._shard(key)
+        with self._locks[i]:
+            return self._shards[i]._lookup(key, default)
+
+    def put(self, key, value):
+        i = self._shard(key)
+        with self._locks[i]:
+            self._shards[i].put(key, value)
+
+    def remove(self, key):
+        i = self._shard(key)
+        with self._locks[i]:
+            self._shards[i].remove(key)
+
+    def __len__(self):
+        # Hold every lock (always in the same order) to get an exact count.
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            return sum(len(shard) for shard in self._shards)
+        finally:
+            for lock in self._locks:
+                lock.release()
+
+    def _entryiter(self):
+        # Copy one shard at a time, so iteration never blocks writers to
+        # the other shards.  Each shard is seen in a consistent state.
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                entries = list(shard._entryiter())
+            yield from entries
@@ -0,0 +1,156 @@
+import random
+from ds2.mapping import Mapping, Entry
+
+_MASK = (1 << 64) - 1
+_MULTIPLIERS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F)
+# How many entries may sit in the stash before we rebuild the tables.
+_STASH = 4
+
+class CuckooMapping(Mapping):
+    def __init__(self, size = 8):
+        # Each of the two tables has a power of two number of slots.
+        self._minsize = 1 << (size - 1).bit_length() if size > 2 else 2
+        self._stashlimit = _STASH
+        self._newtables(self._minsize)
+        self._length = 0
+
+    def _newtables(self, size):
+        self._size = size
+        self._shift = 64 - (size - 1).bit_length()
+        # A fresh seed gives a fresh pair of hash functions.
+        self._seed = random.getrandbits(64)
+        self._hashes = [[None] * size, [None] * size]
+        self._keys = [[None] * size, [None] * size]
+        self._values = [[None] * size, [None] * size]
+        self._stash = []
+        # The longest chain of evictions we try before using the stash.
+        self._maxloop = 16 + 3 * (size - 1).bit_length()
+
+    def _slot(self, keyhash, t):
+        # Multiplicative hashing, keeping the high bits.
+        x = (keyhash ^ self._seed) & _MASK
+        return ((x * _MULTIPLIERS[t]) & _MASK) >> self._shift
+
+    def _find(self, key, keyhash):
+        # A key can only be in one of two slots or in the (small) stash.
+        x = (keyhash ^ self._seed) & _MASK
+        i = ((x * _MULTIPLIERS[0]) & _MASK) >> self._shift
+        if self._hashes[0][i] == keyhash and self._keys[0][i] == key:
+            return 0, i
+        i = ((x * _MULTIPLIERS[1]) & _MASK) >> self._shift
+        if self._hashes[1][i] == keyhash and self._keys[1][i] == key:
+            return 1, i
+        if self._stash:
+            for i, e in enumerate(self._stash):
+                if e.keyhash == keyhash and e.key == key:
+                    return 2, i
+        return None
+
+    def get(self, key):
+        found = self._find(key, hash(key))
+        if found is None:
+            raise KeyError
+        t, i = found
+        return self._stash[i].value if t == 2 else self._values[t][i]
+
+    def _lookup(self, key, default):
+        found = self._find(key, hash(key))
+        if found is None:
+            return default
+        t, i = found
+        return self._stash[i].value if t == 2 else self._values[t][i]
+
+    def put(self, key, value):
+        keyhash = hash(key)
+        found = self._find(key, keyhash)
+        if found is not None:
+            t, i = found
+            if t == 2:
+                self._stash[i].value = value
+            else:
+                self._values[t][i] = value
+            return
+        self._length += 1
+
+        # Keep the tables at most half full.
+        if self._length > self._size:
+            self._rebuild(self._size * 2)
+        leftover = self._place(keyhash, key, value)
+        if leftover is not None:
+            self._rebuild(self._size, [leftover])
+
+    def _place(self, keyhash, key, value):
+        # Put the entry in its slot in the first table, then move whatever
+        # was there to its slot in the other table, and so on.
+        # Return the entry we are left holding if the chain is too long
+        # and the stash is full.
+        t = 0
+        for step in range(self._maxloop):
+            i = self._slot(keyhash, t)
+            hashes, keys, values = self._hashes[t], self._keys[t], self._values[t]
+            if hashes[i] is None:
+                hashes[i], keys[i], values[i] = keyhash, key, value
+                return None
+            hashes[i], keyhash = keyhash, hashes[i]
+            keys[i], key = key, keys[i]
+            values[i], value = value, values[i]
+            t = 1 - t
+        # Keys with exactly the same hash go to the same two slots for every
+        # choice of hash functions, so when both are taken by such keys the
+        # entry can only go in the stash.  It gets a place of its own there.
+        if (self._hashes[0][self._slot(keyhash, 0)] == keyhash
+                and self._hashes[1][self._slot(keyhash, 1)] == keyhash):
+            self._stash.append(Entry(key, value, keyhash))
+            self._stashlimit += 1
+            return None
+        if len(self._stash) < self._stashlimit:
+            self._stash.append(Entry(key, value, keyhash))
+            return None
+        return Entry(key, value, keyhash)
+
+    def _rebuild(self, size, extra = ()):
+        entries = list(self._entryiter())
+        entries.extend(extra)
+        attempts = 0
+        stashlimit = _STASH
+        while True:
+            self._newtables(size)
+            self._stashlimit = stashlimit
+            leftover = None
+            for e in entries:
+                leftover = self._place(e.keyhash, e.key, e.value)
+                if leftover is not None:
+                    break
+            if leftover is None:
+                return
+            # Try new hash functions.  The size is set by the load factor
+            # alone, so if they keep failing, make room in the stash.
+            attempts += 1
+            if attempts % 4 == 0:
+                stashlimit *= 2
+
+    def remove(self, key):
+        found = self._find(key, hash(key))
+        if found is None:
+            raise KeyError
+        t, i = found
+        if t == 2:
+            self._stash.pop(i)
+        else:
+            self._hashes[t][i] = self._keys[t][i] = self._values[t][i] = None
+        self._length -= 1
+
+        # Shrink once the tables are mostly empty.
+        if 8 * self._length < self._size and self._size > self._minsize:
+            self._rebuild(self._size // 2)
+
+    def __len__(self):
+        return self._length
+
+    def _entryiter(self):
+        for t in (0, 1):
+            for keyhash, key, value in zip(self._hashes[t], self._keys[t],
+                                           self._values[t]):
+                if keyhash is not None:
+                    yield Entry(key, value, keyhash)
+        yield from self._stash
@@ -0,0 +1,209 @@
+import hashlib
+import mmap
+import os
+import struct
+from ds2.mapping import Mapping, Entry
+
+# The file starts with a header:
+#   magic, keysize, valuesize, number of slots, length, filled slots.
+# It is followed by the slots, each a fixed-width record:
+#   state, key hash, key length, key, value length, value.
+_HEADER = struct.Struct('<4sIIQQQ')
+_SLOT = struct.Struct('<BQH')
+_VALUELEN = struct.Struct('<H')
+_MAGIC = b'DS2H'
+# The key and value lengths are stored in two bytes.
+_MAXWIDTH = 0xFFFF
+_EMPTY, _LIVE, _DELETED = 0, 1, 2
+
+def _hash(key):
+    # The built-in hash of bytes changes from one process to the next,
+    # but the slots on disk need a hash that does not.
+    return int.from_bytes(hashlib.blake2b(key, digest_size = 8).digest(),
+                          'little')
+
+def _create(path, keysize, valuesize, size):
+    recordsize = _SLOT.size + keysize + _VALUELEN.size + valuesize
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, keysize, valuesize, size, 0, 0))
+        # The slots start out as zeros, i.e. empty.
+        f.truncate(_HEADER.size + size * recordsize)
+
+class DiskHashMapping(Mapping):
+    def __init__(self, path, keysize = None, valuesize = None, size = 1024):
+        self._path = path
+        for width in (keysize, valuesize):
+            if width is not None and not 0 < width <= _MAXWIDTH:
+                raise ValueError("record sizes must be between 1 and %d"
+                                 % _MAXWIDTH)
+        if not os.path.exists(path):
+            size = 1 << (size - 1).bit_length() if size > 1 else 1
+            _create(path, keysize or 32, valuesize or 32, size)
+        self._open()
+        if (keysize not in (None, self._keysize)
+                or valuesize not in (None, self._valuesize)):
+            self.close()
+            raise ValueError("record sizes do not match the existing file")
+
+    def _open(self):
+        self._file = open(self._path, 'r+b')
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+        (magic, self._keysize, self._valuesize,
+         self._size, self._length, self._filled) = _HEADER.unpack_from(self._mm)
+        if magic != _MAGIC:
+            self.close()
+            raise ValueError("not a DiskHashMapping file")
+        self._valueoffset = _SLOT.size + self._keysize
+        self._recordsize = self._valueoffset + _VALUELEN.size + self._valuesize
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def flush(self):
+        self._mm.flush()
+        os.fsync(self._file.fileno())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _offset(self, i):
+        return _HEADER.size + i * self._recordsize
+
+    def _writeheader(self):
+        _HEADER.pack_into(self._mm, 0, _MAGIC, self._keysize, self._valuesize,
+                          self._size, self._length, self._filled)
+
+    def _index(self, key, keyhash):
+        # Linear probing, just like the OpenAddressMapping.
+        # Only the fixed-size prefix of each slot is read, and the key is
+        # read only when the hashes match.
+        mask = self._size - 1
+        mm = self._mm
+        i = keyhash & mask
+        free = None
+        while True:
+            offset = self._offset(i)
+            state, slothash, keylen = _SLOT.unpack_from(mm, offset)
+            if state == _EMPTY:
+                return i if free is None else free
+            if state == _DELETED:
+                if free is None:
+                    free = i
+            elif slothash == keyhash:
+                start = offset + _SLOT.size
+                if mm[start:start + keylen] == key:
+                    return i
+            i = (i + 1) & mask
+
+    def _state(self, i):
+        return self._mm[self._offset(i)]
+
+    def _readkey(self, offset):
+        keylen = _SLOT.unpack_from(self._mm, offset)[2]
+        start = offset + _SLOT.size
+        return self._mm[start:start + keylen]
+
+    def _readvalue(self, offset):
+        start = offset + self._valueoffset
+        valuelen = _VALUELEN.unpack_from(self._mm, start)[0]
+        start += _VALUELEN.size
+        return self._mm[start:start + valuelen]
+
+    def _write(self, i, keyhash, key, value):
+        # The slot is marked live last, once the rest has been written.
+        offset = self._offset(i)
+        start = offset + _SLOT.size
+        self._mm[start:start + len(key)] = key
+        start = offset + self._valueoffset
+        _VALUELEN.pack_into(self._mm, start, len(value))
+        start += _VALUELEN.size
+        self._mm[start:start + len(value)] = value
+        _SLOT.pack_into(self._mm, offset, _LIVE, keyhash, len(key))
+
+    def _check(self, data, width):
+        if not isinstance(data, bytes):
+            raise TypeError("keys and values must be bytes")
+        if len(data) > width:
+            raise ValueError("%d bytes do not fit in a %d byte field"
+                             % (len(data), width))
+
+    def get(self, key):
+        self._check(key, self._keysize)
+        i = self._index(key, _hash(key))
+        if self._state(i) != _LIVE:
+            raise KeyError
+        return self._readvalue(self._offset(i))
+
+    def put(self, key, value):
+        self._check(key, self._keysize)
+        self._check(value, self._valuesize)
+        keyhash = _hash(key)
+        i = self._index(key, keyhash)
+        state = self._state(i)
+        self._write(i, keyhash, key, value)
+        if state != _LIVE:
+            if state == _EMPTY:
+                self._filled += 1
+            self._length += 1
+        self._writeheader()
+
+        # Keep the fraction of filled slots below 2/3.
+        if 3 * self._filled >= 2 * self._size:
+            self._rehash()
+
+    def remove(self, key):
+        self._check(key, self._keysize)
+        i = self._index(key, _hash(key))
+        if self._state(i) != _LIVE:
+            raise KeyError
+        self._mm[self._offset(i)] = _DELETED
+        self._length -= 1
+        self._writeheader()
+
+    def __len__(self):
+        return self._length
+
+    def _slots(self):
+        for i in range(self._size):
+            offset = self._offset(i)
+            if self._mm[offset] == _LIVE:
+                yield offset
+
+    def _entryiter(self):
+        return (Entry(self._readkey(offset), self._readvalue(offset))
+                for offset in self._slots())
+
+    def _rehash(self):
+        # Grow if needed, otherwise just clear out the tombstones.
+        size = self._size
+        while size <= 2 * self._length:
+            size *= 2
+        self._resize(size)
+
+    def _resize(self, size):
+        # Build the new table in a separate file, then swap it in.
+        newpath = self._path + '.resize'
+        if os.path.exists(newpath):
+            os.remove(newpath)
+        new = DiskHashMapping(newpath, self._keysize, self._valuesize, size)
+        mask = new._size - 1
+        # The stored hashes are reused and the keys are known to be distinct,
+        # so we only need to find an empty slot for each one.
+        for offset in self._slots():
+            keyhash = _SLOT.unpack_from(self._mm, offset)[1]
+            i = keyhash & mask
+            while new._state(i) != _EMPTY:
+                i = (i + 1) & mask
+            new._write(i, keyhash, self._readkey(offset),
+                       self._readvalue(offset))
+        new._length = new._filled = self._length
+        new._writeheader()
+        new.flush()
+        new.close()
+        self.close()
+        os.replace(newpath, self._path)
+        self._open()
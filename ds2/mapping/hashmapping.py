@@ -3,6 +3,7 @@ from ds2.mapping import Mapping, ListMapping
 class HashMapping(Mapping):
     def __init__(self, size = 100):
         self._size = size
+        self._minsize = size
         self._buckets = [ListMapping() for i in range(self._size)]
         self._length = 0
 
@@ -10,30 +11,83 @@ class HashMapping(Mapping):
         return (e for bucket in self._buckets for e in bucket._entryiter())
 
     def get(self, key):
-        bucket = self._bucket(key)
-        return bucket[key]
+        keyhash = hash(key)
+        bucket = self._bucket(keyhash)
+        return bucket.get(key, keyhash)
+
+    def _lookup(self, key, default):
+        keyhash = hash(key)
+        return self._bucket(keyhash)._lookup(key, default, keyhash)
+
+    def get_many(self, keys, default = None):
+        results = []
+        for key in keys:
+            keyhash = hash(key)
+            results.append(self._bucket(keyhash)._lookup(key, default, keyhash))
+        return results
 
     def put(self, key, value):
-        bucket = self._bucket(key)
-        if key not in bucket:
+        keyhash = hash(key)
+        bucket = self._bucket(keyhash)
+        if bucket._entry(key, keyhash) is None:
             self._length += 1
-        bucket[key] = value
+        bucket.put(key, value, keyhash)
 
         # Check if we need more buckets.
         if self._length > self._size:
             self._double()
 
+    def remove(self, key):
+        keyhash = hash(key)
+        bucket = self._bucket(keyhash)
+        bucket.remove(key, keyhash)
+        self._length -= 1
+
+        # Check if we have too many buckets.
+        if 4 * self._length < self._size and self._size // 2 >= self._minsize:
+            self._halve()
+
+    def update(self, items, sizehint = None):
+        if hasattr(items, 'items'):
+            items = items.items()
+        if sizehint is not None or not hasattr(items, '__len__'):
+            # We cannot trust the hint, so every put checks the load.
+            if sizehint is not None:
+                self._presize(sizehint)
+            Mapping.update(self, items)
+            return
+        # There are at most len(items) new keys, so one resize is enough.
+        self._presize(len(items))
+        for key, value in items:
+            keyhash = hash(key)
+            bucket = self._bucket(keyhash)
+            if bucket._entry(key, keyhash) is None:
+                self._length += 1
+            bucket.put(key, value, keyhash)
+
     def __len__(self):
         return self._length
 
-    def _bucket(self, key):
-        return self._buckets[hash(key) % self._size]
+    def _bucket(self, keyhash):
+        return self._buckets[keyhash % self._size]
 
     def _double(self):
+        self._resize(self._size * 2)
+
+    def _halve(self):
+        self._resize(self._size // 2)
+
+    def _presize(self, n):
+        if self._length + n > self._size:
+            self._resize(self._length + n)
+
+    def _resize(self, size):
         # Save the old buckets
         oldbuckets = self._buckets
-        # Reinitialize with more buckets.
-        self.__init__(self._size * 2)
+        # Reinitialize with the new number of buckets.
+        self._size = size
+        self._buckets = [ListMapping() for i in range(self._size)]
+        # Each entry remembers its hash, so we never call hash() again.
         for bucket in oldbuckets:
-            for key, value in bucket.items():
-                self[key] = value
+            for e in bucket._entryiter():
+                self._bucket(e.keyhash).put(e.key, e.value, e.keyhash)
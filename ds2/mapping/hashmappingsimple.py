@@ -1,8 +1,8 @@
 from ds2.mapping import ListMapping
 
 class HashMappingSimple:
-    def __init__(self):
-        self._size = 100
+    def __init__(self, size = 100):
+        self._size = size
         self._buckets = [ListMapping() for i in range(self._size)]
 
     def put(self, key, value):
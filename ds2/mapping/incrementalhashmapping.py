@@ -0,0 +1,69 @@
+from ds2.mapping import HashMapping, ListMapping
+
+class IncrementalHashMapping(HashMapping):
+    def __init__(self, size = 100, step = 8):
+        HashMapping.__init__(self, size)
+        # Moving 8 buckets per operation is enough to finish each resize
+        # before the next one is due, whether the table grows or shrinks.
+        self._step = step
+        self._oldbuckets = None
+        self._moved = 0
+
+    def _entryiter(self):
+        yield from HashMapping._entryiter(self)
+        if self._oldbuckets is not None:
+            for bucket in self._oldbuckets[self._moved:]:
+                yield from bucket._entryiter()
+
+    def get(self, key):
+        self._migrate(self._step)
+        return HashMapping.get(self, key)
+
+    def _lookup(self, key, default):
+        self._migrate(self._step)
+        return HashMapping._lookup(self, key, default)
+
+    def put(self, key, value):
+        self._migrate(self._step)
+        HashMapping.put(self, key, value)
+
+    def remove(self, key):
+        self._migrate(self._step)
+        HashMapping.remove(self, key)
+
+    def _bucket(self, keyhash):
+        # Old buckets that have not been moved yet still hold their keys.
+        if self._oldbuckets is not None:
+            i = keyhash % len(self._oldbuckets)
+            if i >= self._moved:
+                return self._oldbuckets[i]
+        return self._buckets[keyhash % self._size]
+
+    def _resize(self, size):
+        # Finish any resize that is still in progress.
+        if self._oldbuckets is not None:
+            self._migrate(len(self._oldbuckets))
+        # Keep the old buckets around and move them over a few at a time.
+        self._oldbuckets = self._buckets
+        self._moved = 0
+        self._size = size
+        self._buckets = [ListMapping() for i in range(self._size)]
+
+    def _presize(self, n):
+        HashMapping._presize(self, n)
+        # A bulk load is about to follow, so finish the resize right away.
+        if self._oldbuckets is not None:
+            self._migrate(len(self._oldbuckets))
+
+    def _migrate(self, count):
+        if self._oldbuckets is None:
+            return
+        oldbuckets = self._oldbuckets
+        stop = min(self._moved + count, len(oldbuckets))
+        for i in range(self._moved, stop):
+            for e in oldbuckets[i]._entryiter():
+                self._buckets[e.keyhash % self._size].put(e.key, e.value, e.keyhash)
+            oldbuckets[i] = None
+        self._moved = stop
+        if stop == len(oldbuckets):
+            self._oldbuckets = None
@@ -4,23 +4,49 @@ class ListMapping(Mapping):
     def __init__(self):
         self._entries = []
 
-    def put(self, key, value):
-        e = self._entry(key)
+    def put(self, key, value, keyhash = None):
+        e = self._entry(key, keyhash)
         if e is not None:
             e.value = value
         else:
-            self._entries.append(Entry(key, value))
+            self._entries.append(Entry(key, value, keyhash))
 
-    def get(self, key):
-        e = self._entry(key)
+    def get(self, key, keyhash = None):
+        e = self._entry(key, keyhash)
         if e is not None:
             return e.value
         else:
             raise KeyError
 
-    def _entry(self, key):
+    def remove(self, key, keyhash = None):
+        e = self._entry(key, keyhash)
+        if e is None:
+            raise KeyError
+        self._entries.remove(e)
+
+    def _lookup(self, key, default, keyhash = None):
+        e = self._entry(key, keyhash)
+        return e.value if e is not None else default
+
+    def get_many(self, keys, default = None):
+        keys = list(keys)
+        results = [default] * len(keys)
+        try:
+            # Find all the keys in a single pass over the entries.
+            wanted = {}
+            for i, key in enumerate(keys):
+                wanted.setdefault(key, []).append(i)
+            for e in self._entries:
+                for i in wanted.get(e.key, ()):
+                    results[i] = e.value
+        except TypeError:
+            # Some key is unhashable, so search for each one separately.
+            return Mapping.get_many(self, keys, default)
+        return results
+
+    def _entry(self, key, keyhash = None):
         for e in self._entries:
-            if e.key == key:
+            if (keyhash is None or e.keyhash == keyhash) and e.key == key:
                 return e
         return None
 
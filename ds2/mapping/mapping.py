@@ -1,13 +1,17 @@
 # mapping/mapping.py
 
 class Entry:
-    def __init__(self, key, value):
+    def __init__(self, key, value, keyhash = None):
         self.key = key
         self.value = value
+        self.keyhash = keyhash
 
     def __str__(self):
         return str(self.key) + " : " + str(self.value)
 
+# A value that is never stored, used to signal a missing key.
+_MISSING = object()
+
 class Mapping:
 
     # Child class needs to implement this!
@@ -26,6 +30,10 @@ class Mapping:
     def _entryiter(self):
         raise NotImplementedError   
 
+    # Child class needs to implement this to support deletion.
+    def remove(self, key):
+        raise NotImplementedError
+
     def __iter__(self):
       return (e.key for e in self._entryiter())
 
@@ -35,12 +43,21 @@ class Mapping:
     def items(self):
         return ((e.key, e.value) for e in self._entryiter())
 
-    def __contains__(self, key):
+    # Child class can override this to avoid raising a KeyError.
+    def _lookup(self, key, default):
         try:
-            self.get(key)
+            return self.get(key)
         except KeyError:
-            return False
-        return True
+            return default
+
+    def __contains__(self, key):
+        return self._lookup(key, _MISSING) is not _MISSING
+
+    def get_many(self, keys, default = None):
+        return [self._lookup(key, default) for key in keys]
+
+    def contains_many(self, keys):
+        return [v is not _MISSING for v in self.get_many(keys, _MISSING)]
 
     def __getitem__(self, key):
         return self.get(key)
@@ -48,5 +65,20 @@ class Mapping:
     def __setitem__(self, key, value):
         self.put(key, value)
 
+    def __delitem__(self, key):
+        self.remove(key)
+
+    def update(self, items, sizehint = None):
+        if hasattr(items, 'items'):
+            items = items.items()
+        for key, value in items:
+            self.put(key, value)
+
+    @classmethod
+    def from_items(cls, items, sizehint = None):
+        M = cls()
+        M.update(items, sizehint)
+        return M
+
     def __str__(self):
         return "{" + ", ".join(str(e) for e in self._entryiter()) + "}"
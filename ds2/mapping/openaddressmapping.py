@@ -0,0 +1,119 @@
+from ds2.mapping import Mapping, Entry
+
+# Marks a slot whose entry was removed.
+# Lookups probe past it, but put may reuse it.
+_DELETED = object()
+
+def _live(keyhash):
+    return keyhash is not None and keyhash is not _DELETED
+
+class OpenAddressMapping(Mapping):
+    def __init__(self, size = 8):
+        # The number of slots is always a power of two.
+        self._minsize = 1 << (size - 1).bit_length() if size > 1 else 1
+        self._newslots(self._minsize)
+
+    def _newslots(self, size):
+        self._size = size
+        self._hashes = [None] * size
+        self._keys = [None] * size
+        self._values = [None] * size
+        self._length = 0
+        # The number of slots that are in use or hold a tombstone.
+        self._filled = 0
+
+    def _index(self, key, keyhash):
+        # Linear probing until we find the key or an empty slot.
+        # If the key is missing, return the first slot that could hold it.
+        mask = self._size - 1
+        hashes, keys = self._hashes, self._keys
+        i = keyhash & mask
+        free = None
+        while hashes[i] is not None:
+            if hashes[i] is _DELETED:
+                if free is None:
+                    free = i
+            elif hashes[i] == keyhash and keys[i] == key:
+                return i
+            i = (i + 1) & mask
+        return i if free is None else free
+
+    def get(self, key):
+        i = self._index(key, hash(key))
+        if not _live(self._hashes[i]):
+            raise KeyError
+        return self._values[i]
+
+    def _lookup(self, key, default):
+        i = self._index(key, hash(key))
+        return self._values[i] if _live(self._hashes[i]) else default
+
+    def put(self, key, value):
+        keyhash = hash(key)
+        i = self._index(key, keyhash)
+        if not _live(self._hashes[i]):
+            if self._hashes[i] is None:
+                self._filled += 1
+            self._hashes[i] = keyhash
+            self._keys[i] = key
+            self._length += 1
+        self._values[i] = value
+
+        # Keep the fraction of filled slots below 2/3.
+        if 3 * self._filled >= 2 * self._size:
+            self._rehash()
+
+    def remove(self, key):
+        i = self._index(key, hash(key))
+        if not _live(self._hashes[i]):
+            raise KeyError
+        self._hashes[i] = _DELETED
+        self._keys[i] = self._values[i] = None
+        self._length -= 1
+
+        # Shrink once the table is mostly empty.
+        if 8 * self._length < self._size and self._size > self._minsize:
+            self._rehash()
+
+    def __len__(self):
+        return self._length
+
+    def _entryiter(self):
+        return (Entry(k, v) for h, k, v in
+                zip(self._hashes, self._keys, self._values) if _live(h))
+
+    def __iter__(self):
+        return (k for h, k in zip(self._hashes, self._keys) if _live(h))
+
+    def values(self):
+        return (v for h, v in zip(self._hashes, self._values) if _live(h))
+
+    def items(self):
+        return ((k, v) for h, k, v in
+                zip(self._hashes, self._keys, self._values) if _live(h))
+
+    def _rehash(self):
+        # Pick the smallest table that is at most half full.
+        size = self._minsize
+        while size <= 2 * self._length:
+            size *= 2
+        self._resize(size)
+
+    def _resize(self, size):
+        # Save the old slots.
+        oldslots = zip(self._hashes, self._keys, self._values)
+        # Reinitialize with the new number of slots.
+        self._newslots(size)
+        mask = self._size - 1
+        hashes, keys, values = self._hashes, self._keys, self._values
+        # The stored hashes are reused and the keys are known to be distinct,
+        # so we only need to find an empty slot for each one.
+        # Tombstones are dropped.
+        for keyhash, key, value in oldslots:
+            if _live(keyhash):
+                i = keyhash & mask
+                while hashes[i] is not None:
+                    i = (i + 1) & mask
+                hashes[i], keys[i], values[i] = keyhash, key, value
+                self._length += 1
+        self._filled = self._length
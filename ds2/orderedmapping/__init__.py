@@ -1,5 +1,14 @@
-from ds2.orderedmapping.bstmapping import BSTMapping, BSTNode
-from ds2.orderedmapping.balancedbst import BalancedBST, BalancedBSTNode
+from ds2.orderedmapping.bstmapping import BSTMapping, BSTNode, BSTCursor
+from ds2.orderedmapping.balancedbst import (BalancedBST, BalancedBSTNode,
+                                            JoinableBST, JoinableNode)
 from ds2.orderedmapping.wbtree import WBTree, WBTreeNode
 from ds2.orderedmapping.avltree import AVLTree, AVLTreeNode
 from ds2.orderedmapping.splaytree import SplayTree, SplayTreeNode
+from ds2.orderedmapping.bplustree import BPlusTree
+from ds2.orderedmapping.persistentavltree import PersistentAVLTree, PersistentAVLNode
+from ds2.orderedmapping.instrumented import TreeStats, instrumented
+from ds2.orderedmapping.eytzingermapping import EytzingerMapping
+from ds2.orderedmapping.augmented import augmented, Monoid, SUM, COUNT, MIN, MAX
+from ds2.orderedmapping.intervaltree import IntervalTree
+from ds2.orderedmapping.skiplist import SkipList
+from ds2.orderedmapping.arrayavltree import ArrayAVLTree, ArrayAVLCursor
@@ -0,0 +1,569 @@
+from array import array
+from ds2.mapping import Mapping, Entry
+from ds2.orderedmapping.eytzingermapping import EytzingerMapping
+from ds2.orderedmapping.balancedbst import _issorted
+
+# An AVL tree without node objects.  A node is an index into parallel
+# arrays, and the links, heights and lengths are machine integers instead
+# of Python objects.  Index 0 is the empty tree, with height and length 0,
+# so no test for None is needed.  Removed slots are kept in a free list,
+# linked through the left array, and used again before the arrays grow.
+
+class ArrayAVLTree(Mapping):
+    def __init__(self):
+        self._keys = [None]
+        self._values = [None]
+        self._left = array('q', [0])
+        self._right = array('q', [0])
+        self._height = array('q', [0])
+        self._length = array('q', [0])
+        self._root = 0
+        self._free = 0
+
+    def _newnode(self, key, value):
+        i = self._free
+        if i:
+            self._free = self._left[i]
+            self._keys[i] = key
+            self._values[i] = value
+            self._left[i] = self._right[i] = 0
+            self._height[i] = self._length[i] = 1
+            return i
+        self._keys.append(key)
+        self._values.append(value)
+        self._left.append(0)
+        self._right.append(0)
+        self._height.append(1)
+        self._length.append(1)
+        return len(self._keys) - 1
+
+    def _freenode(self, i):
+        # Drop the references, so the key and value can be collected.
+        self._keys[i] = self._values[i] = None
+        self._left[i] = self._free
+        self._free = i
+
+    def _update(self, i):
+        left, right = self._left[i], self._right[i]
+        height = self._height
+        height[i] = 1 + max(height[left], height[right])
+        self._length[i] = 1 + self._length[left] + self._length[right]
+
+    def _rotateright(self, i):
+        new = self._left[i]
+        self._left[i] = self._right[new]
+        self._right[new] = i
+        self._update(i)
+        self._update(new)
+        return new
+
+    def _rotateleft(self, i):
+        new = self._right[i]
+        self._right[i] = self._left[new]
+        self._left[new] = i
+        self._update(i)
+        self._update(new)
+        return new
+
+    def _rebalance(self, i):
+        left, right, height = self._left, self._right, self._height
+        balance = height[right[i]] - height[left[i]]
+        if balance > 1:
+            if height[right[right[i]]] < height[left[right[i]]]:
+                right[i] = self._rotateright(right[i])
+            return self._rotateleft(i)
+        if balance < -1:
+            if height[left[left[i]]] < height[right[left[i]]]:
+                left[i] = self._rotateleft(left[i])
+            return self._rotateright(i)
+        self._update(i)
+        return i
+
+    def _fixpath(self, path, child):
+        # Relink and rebalance from the bottom of the path up to the root.
+        for i, wentleft in reversed(path):
+            if wentleft:
+                self._left[i] = child
+            else:
+                self._right[i] = child
+            child = self._rebalance(i)
+        self._root = child
+
+    def _find(self, key):
+        keys, left, right = self._keys, self._left, self._right
+        i = self._root
+        while i:
+            if key == keys[i]:
+                return i
+            i = left[i] if key < keys[i] else right[i]
+        return 0
+
+    def get(self, key):
+        i = self._find(key)
+        if i:
+            return self._values[i]
+        raise KeyError
+
+    def _lookup(self, key, default):
+        i = self._find(key)
+        return self._values[i] if i else default
+
+    def put(self, key, value):
+        keys, left, right = self._keys, self._left, self._right
+        path = []
+        i = self._root
+        while i:
+            if key == keys[i]:
+                self._values[i] = value
+                return
+            wentleft = key < keys[i]
+            path.append((i, wentleft))
+            i = left[i] if wentleft else right[i]
+        self._fixpath(path, self._newnode(key, value))
+
+    def remove(self, key):
+        keys, left, right = self._keys, self._left, self._right
+        path = []
+        i = self._root
+        while i and key != keys[i]:
+            wentleft = key < keys[i]
+            path.append((i, wentleft))
+            i = left[i] if wentleft else right[i]
+        if not i:
+            raise KeyError
+        if left[i] and right[i]:
+            # Move the next entry up into this node and remove its node.
+            found = i
+            path.append((i, False))
+            i = right[i]
+            while left[i]:
+                path.append((i, True))
+                i = left[i]
+            keys[found], self._values[found] = keys[i], self._values[i]
+        child = left[i] or right[i]
+        self._freenode(i)
+        self._fixpath(path, child)
+
+    def __len__(self):
+        return self._length[self._root]
+
+    def _keyvalue(self, i):
+        if i:
+            return self._keys[i], self._values[i]
+        return None, None
+
+    def _below(self, key, inclusive):
+        keys, left, right = self._keys, self._left, self._right
+        i, best = self._root, 0
+        while i:
+            if keys[i] < key or (inclusive and keys[i] == key):
+                best, i = i, right[i]
+            else:
+                i = left[i]
+        return best
+
+    def _above(self, key, inclusive):
+        keys, left, right = self._keys, self._left, self._right
+        i, best = self._root, 0
+        while i:
+            if key < keys[i] or (inclusive and keys[i] == key):
+                best, i = i, left[i]
+            else:
+                i = right[i]
+        return best
+
+    def floor(self, key):
+        return self._keyvalue(self._below(key, True))
+
+    def predecessor(self, key):
+        return self._keyvalue(self._below(key, False))
+
+    def ceiling(self, key):
+        return self._keyvalue(self._above(key, True))
+
+    def successor(self, key):
+        return self._keyvalue(self._above(key, False))
+
+    def rank(self, key):
+        # The number of keys less than key.
+        keys, left, right, length = (self._keys, self._left, self._right,
+                                     self._length)
+        i, rank = self._root, 0
+        while i:
+            if keys[i] < key:
+                rank += length[left[i]] + 1
+                i = right[i]
+            else:
+                i = left[i]
+        return rank
+
+    def select(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError
+        left, right, length = self._left, self._right, self._length
+        i = self._root
+        while True:
+            smaller = length[left[i]]
+            if index == smaller:
+                return self._keyvalue(i)
+            if index < smaller:
+                i = left[i]
+            else:
+                index -= smaller + 1
+                i = right[i]
+
+    def count_range(self, lo, hi):
+        return max(0, self.rank(hi) - self.rank(lo))
+
+    def _inorder(self, lo = None, root = None):
+        # Yield the nodes in order, starting from the first key >= lo.
+        keys, left, right = self._keys, self._left, self._right
+        stack = []
+        i = self._root if root is None else root
+        while i:
+            if lo is not None and keys[i] < lo:
+                i = right[i]
+            else:
+                stack.append(i)
+                i = left[i]
+        while stack:
+            i = stack.pop()
+            yield i
+            i = right[i]
+            while i:
+                stack.append(i)
+                i = left[i]
+
+    def range(self, lo, hi):
+        keys, values = self._keys, self._values
+        for i in self._inorder(lo):
+            if not keys[i] < hi:
+                return
+            yield keys[i], values[i]
+
+    def _entryiter(self):
+        keys, values = self._keys, self._values
+        return (Entry(keys[i], values[i]) for i in self._inorder())
+
+    def __iter__(self):
+        keys = self._keys
+        return (keys[i] for i in self._inorder())
+
+    def __reversed__(self):
+        keys, left, right = self._keys, self._left, self._right
+        stack = []
+        i = self._root
+        while stack or i:
+            while i:
+                stack.append(i)
+                i = right[i]
+            i = stack.pop()
+            yield keys[i]
+            i = left[i]
+
+    def values(self):
+        values = self._values
+        return (values[i] for i in self._inorder())
+
+    def items(self):
+        keys, values = self._keys, self._values
+        return ((keys[i], values[i]) for i in self._inorder())
+
+    def cursor(self, key = None):
+        cursor = ArrayAVLCursor(self)
+        if key is not None:
+            cursor.seek(key)
+        return cursor
+
+    def freeze(self):
+        return EytzingerMapping(self.items())
+
+    def _build(self, items, start, stop):
+        if start == stop:
+            return 0
+        mid = (start + stop) // 2
+        i = self._newnode(*items[mid])
+        self._left[i] = self._build(items, start, mid)
+        self._right[i] = self._build(items, mid + 1, stop)
+        self._update(i)
+        return i
+
+    @classmethod
+    def from_sorted(cls, items):
+        items = list(items)
+        if not _issorted(items):
+            raise ValueError("keys must be strictly increasing")
+        M = cls()
+        M._root = M._build(items, 0, len(items))
+        return M
+
+    def update(self, items, sizehint = None):
+        if hasattr(items, 'items'):
+            items = items.items()
+        items = list(items)
+        if not self._root and _issorted(items):
+            self._root = self._build(items, 0, len(items))
+        else:
+            Mapping.update(self, items)
+
+    # The joins, splits and set operations below work on subtrees given
+    # by their roots, all in the arrays of this tree.
+
+    def _join(self, less, mid, greater):
+        left, right, height = self._left, self._right, self._height
+        if height[less] > height[greater] + 1:
+            right[less] = self._join(right[less], mid, greater)
+            return self._rebalance(less)
+        if height[greater] > height[less] + 1:
+            left[greater] = self._join(less, mid, left[greater])
+            return self._rebalance(greater)
+        left[mid], right[mid] = less, greater
+        self._update(mid)
+        return mid
+
+    def _splitlast(self, i):
+        if not self._right[i]:
+            less = self._left[i]
+            self._left[i] = 0
+            self._update(i)
+            return less, i
+        less, last = self._splitlast(self._right[i])
+        return self._join(self._left[i], i, less), last
+
+    def _join2(self, less, greater):
+        if not less:
+            return greater
+        less, last = self._splitlast(less)
+        return self._join(less, last, greater)
+
+    def _split(self, i, key):
+        # Return the subtrees of keys less than and greater than key, and
+        # the node with the key itself (or 0).
+        if not i:
+            return 0, 0, 0
+        less, greater = self._left[i], self._right[i]
+        if key == self._keys[i]:
+            self._left[i] = self._right[i] = 0
+            self._update(i)
+            return less, i, greater
+        if key < self._keys[i]:
+            less, mid, rest = self._split(less, key)
+            return less, mid, self._join(rest, i, greater)
+        rest, mid, greater = self._split(greater, key)
+        return self._join(less, i, rest), mid, greater
+
+    def _freetree(self, i):
+        stack = [i] if i else []
+        while stack:
+            i = stack.pop()
+            stack.extend(child for child in (self._left[i], self._right[i])
+                         if child)
+            self._freenode(i)
+
+    def _union(self, a, b):
+        # When a key is in both, the node from b is kept.
+        if not a:
+            return b
+        if not b:
+            return a
+        less, greater = self._left[b], self._right[b]
+        lessa, mid, greatera = self._split(a, self._keys[b])
+        if mid:
+            self._freenode(mid)
+        return self._join(self._union(lessa, less), b,
+                          self._union(greatera, greater))
+
+    def _intersection(self, a, b):
+        # The nodes are taken from a.
+        if not a or not b:
+            self._freetree(a)
+            self._freetree(b)
+            return 0
+        lessb, greaterb = self._left[b], self._right[b]
+        less, mid, greater = self._split(a, self._keys[b])
+        self._freenode(b)
+        less = self._intersection(less, lessb)
+        greater = self._intersection(greater, greaterb)
+        if not mid:
+            return self._join2(less, greater)
+        return self._join(less, mid, greater)
+
+    def _difference(self, a, b):
+        if not a or not b:
+            self._freetree(b)
+            return a
+        lessb, greaterb = self._left[b], self._right[b]
+        less, mid, greater = self._split(a, self._keys[b])
+        self._freenode(b)
+        if mid:
+            self._freenode(mid)
+        less = self._difference(less, lessb)
+        greater = self._difference(greater, greaterb)
+        return self._join2(less, greater)
+
+    # A tree cannot share its arrays with another.  So, the methods below
+    # work in the arrays of the bigger tree and copy the smaller one in or
+    # out.  That adds time linear in the size of the smaller tree.  Like
+    # those of AVLTree, they return new trees and leave their inputs empty.
+
+    def _moveout(self):
+        # Return a new tree with the contents of this one, which is left
+        # empty.
+        M = type(self)()
+        M.__dict__, self.__dict__ = self.__dict__, M.__dict__
+        return M
+
+    def _copyin(self, other, root = None):
+        # Build the entries of a subtree of other in the arrays of this
+        # tree, and return its root.
+        items = [(other._keys[i], other._values[i])
+                 for i in other._inorder(root = root)]
+        return self._build(items, 0, len(items))
+
+    def _take(self, other):
+        # Return a new tree holding the arrays of the bigger of the two
+        # trees, and the roots of both trees within those arrays.
+        if type(other) is not type(self):
+            raise TypeError("both trees must have the same type")
+        if len(self) >= len(other):
+            M = self._moveout()
+            a, b = M._root, M._copyin(other)
+        else:
+            M = other._moveout()
+            a, b = M._copyin(self), M._root
+        self.__init__()
+        other.__init__()
+        return M, a, b
+
+    def _separate(self, less, greater):
+        # Put two subtrees of this tree in trees of their own.
+        other = type(self)()
+        if self._length[less] >= self._length[greater]:
+            other._root = other._copyin(self, greater)
+            self._freetree(greater)
+            self._root = less
+            return self, other
+        other._root = other._copyin(self, less)
+        self._freetree(less)
+        self._root = greater
+        return other, self
+
+    def split(self, key):
+        M = self._moveout()
+        less, mid, greater = M._split(M._root, key)
+        if mid:
+            greater = M._join(0, mid, greater)
+        return M._separate(less, greater)
+
+    def join(self, other):
+        if self._root and other._root:
+            if not self.select(-1)[0] < other.select(0)[0]:
+                raise ValueError("keys must all be less than those of other")
+        M, a, b = self._take(other)
+        M._root = M._join2(a, b)
+        return M
+
+    def union(self, other):
+        M, a, b = self._take(other)
+        M._root = M._union(a, b)
+        return M
+
+    def intersection(self, other):
+        M, a, b = self._take(other)
+        M._root = M._intersection(a, b)
+        return M
+
+    def difference(self, other):
+        M, a, b = self._take(other)
+        M._root = M._difference(a, b)
+        return M
+
+class ArrayAVLCursor:
+    # The same as BSTCursor, with a path of indices instead of nodes.
+    def __init__(self, tree):
+        self._tree = tree
+        self._path = []
+        self.seek(None)
+
+    def seek(self, key):
+        # Stop at the smallest key >= key, or the smallest key if key is None.
+        tree = self._tree
+        keys, left, right = tree._keys, tree._left, tree._right
+        self._path = []
+        depth = 0
+        i = tree._root
+        while i:
+            self._path.append(i)
+            if key is None or not keys[i] < key:
+                depth = len(self._path)
+                i = left[i]
+            else:
+                i = right[i]
+        del self._path[depth:]
+
+    def seekend(self):
+        self._path = []
+
+    def hasnext(self):
+        return len(self._path) > 0
+
+    def hasprev(self):
+        if self._path:
+            right = self._tree._right
+            return self._tree._left[self._path[-1]] != 0 or any(
+                right[parent] == child
+                for parent, child in zip(self._path, self._path[1:]))
+        return self._tree._root != 0
+
+    def next(self):
+        if not self._path:
+            raise StopIteration
+        left, right = self._tree._left, self._tree._right
+        path = self._path
+        i = path[-1]
+        if right[i]:
+            child = right[i]
+            path.append(child)
+            while left[child]:
+                child = left[child]
+                path.append(child)
+        else:
+            child = path.pop()
+            while path and right[path[-1]] == child:
+                child = path.pop()
+        return self._tree._keyvalue(i)
+
+    def prev(self):
+        tree = self._tree
+        left, right = tree._left, tree._right
+        path = self._path
+        if not path:
+            if not tree._root:
+                raise StopIteration
+            i = tree._root
+            path.append(i)
+            while right[i]:
+                i = right[i]
+                path.append(i)
+        elif left[path[-1]]:
+            i = left[path[-1]]
+            path.append(i)
+            while right[i]:
+                i = right[i]
+                path.append(i)
+        else:
+            for j in range(len(path) - 1, 0, -1):
+                if right[path[j - 1]] == path[j]:
+                    del path[j:]
+                    break
+            else:
+                raise StopIteration
+        return tree._keyvalue(path[-1])
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self.next()
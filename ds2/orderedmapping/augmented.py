@@ -0,0 +1,153 @@
+import operator
+
+# A monoid has an associative combine function and an identity for it.
+# The measure of an entry is what gets combined, by default its value.
+class Monoid:
+    def __init__(self, combine, identity, measure = None):
+        self.combine = combine
+        self.identity = identity
+        self.measure = measure if measure is not None else _value
+
+def _value(key, value):
+    return value
+
+def _one(key, value):
+    return 1
+
+# None is the identity for min and max, so any values that can be
+# compared will work.
+def _min(a, b):
+    return b if a is None else a if b is None else min(a, b)
+
+def _max(a, b):
+    return b if a is None else a if b is None else max(a, b)
+
+SUM = Monoid(operator.add, 0)
+COUNT = Monoid(operator.add, 0, _one)
+MIN = Monoid(_min, None)
+MAX = Monoid(_max, None)
+
+def _augmentednode(base, monoids):
+    combine, measure = monoids[0].combine, monoids[0].measure
+
+    class AugmentedNode(base):
+        def __init__(self, key, value):
+            base.__init__(self, key, value)
+            self._updatelength()
+
+        def newnode(self, key, value):
+            return type(self)(key, value)
+
+        # Every change to the shape of the tree already calls this, so it
+        # is the one place to keep the aggregates up to date.
+        def _updatelength(self):
+            base._updatelength(self)
+            key, value, left, right = self.key, self.value, self.left, self.right
+            aggregates = [m.measure(key, value) for m in monoids]
+            if left is not None:
+                aggregates = [m.combine(a, b) for m, a, b in
+                              zip(monoids, left.aggregates, aggregates)]
+            if right is not None:
+                aggregates = [m.combine(a, b) for m, a, b in
+                              zip(monoids, aggregates, right.aggregates)]
+            self.aggregates = aggregates
+
+        if len(monoids) == 1:
+            # The usual case, without the loops over the monoids.
+            def _updatelength(self):
+                base._updatelength(self)
+                left, right = self.left, self.right
+                aggregate = measure(self.key, self.value)
+                if left is not None:
+                    aggregate = combine(left.aggregates[0], aggregate)
+                if right is not None:
+                    aggregate = combine(aggregate, right.aggregates[0])
+                self.aggregates = (aggregate,)
+
+        def _updatelengths(self, nodes):
+            for node in reversed(nodes):
+                node._updatelength()
+
+    return AugmentedNode
+
+def _aggregate(node, lo, hi, i, m):
+    def below(key):
+        return hi is None or key < hi
+
+    def above(key):
+        return lo is None or not key < lo
+
+    def total(node):
+        return node.aggregates[i] if node is not None else m.identity
+
+    # Find the first node in the range, where the search paths for lo and
+    # hi split.
+    while node is not None and not (above(node.key) and below(node.key)):
+        node = node.right if below(node.key) else node.left
+    if node is None:
+        return m.identity
+
+    # Everything on the left from lo up, in order.
+    left, other = m.identity, node.left
+    while other is not None:
+        if above(other.key):
+            piece = m.combine(m.measure(other.key, other.value),
+                              total(other.right))
+            left = m.combine(piece, left)
+            other = other.left
+        else:
+            other = other.right
+
+    # Everything on the right up to hi, in order.
+    right, other = m.identity, node.right
+    while other is not None:
+        if below(other.key):
+            piece = m.combine(total(other.left),
+                              m.measure(other.key, other.value))
+            right = m.combine(right, piece)
+            other = other.right
+        else:
+            other = other.left
+
+    middle = m.measure(node.key, node.value)
+    return m.combine(m.combine(left, middle), right)
+
+def augmented(treeclass, **monoids):
+    # Return a subclass of a BalancedBST class whose nodes keep the
+    # combined measure of their subtrees for each of the given monoids.
+    if not monoids:
+        raise ValueError("at least one monoid is needed")
+    names = list(monoids)
+    node = _augmentednode(treeclass.Node, [monoids[n] for n in names])
+
+    class AugmentedTree(treeclass):
+        Node = node
+
+        def put(self, key, value):
+            length = len(self)
+            treeclass.put(self, key, value)
+            if len(self) != length:
+                return
+            # Overwriting a value does not change the shape of the tree,
+            # so fix the aggregates along the path to the key.
+            path = []
+            current = self._root
+            while current is not None and key != current.key:
+                path.append(current)
+                current = current.left if key < current.key else current.right
+            if current is not None:
+                current._updatelength()
+                for other in reversed(path):
+                    other._updatelength()
+
+        def aggregate(self, lo = None, hi = None, name = None):
+            # Combine the measures of the entries with lo <= key < hi.
+            # None means there is no bound on that side.
+            if name is not None:
+                monoid = monoids[name]
+                return _aggregate(self._root, lo, hi, names.index(name), monoid)
+            return {n: _aggregate(self._root, lo, hi, i, monoids[n])
+                    for i, n in enumerate(names)}
+
+    AugmentedTree.__name__ = 'Augmented' + treeclass.__name__
+    return AugmentedTree
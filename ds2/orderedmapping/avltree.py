@@ -1,14 +1,10 @@
-from ds2.orderedmapping import BalancedBST, BalancedBSTNode
+from ds2.orderedmapping import (BalancedBST, BalancedBSTNode, JoinableBST,
+                                JoinableNode)
 
 def height(node):
     return node.height if node else -1
 
-def update(node):
-    if node:
-        node._updatelength()
-        node._updateheight()
-
-class AVLTreeNode(BalancedBSTNode):
+class AVLTreeNode(BalancedBSTNode, JoinableNode):
     def __init__(self, key, value):
         BalancedBSTNode.__init__(self, key, value)
         self._updateheight()
@@ -16,12 +12,20 @@ class AVLTreeNode(BalancedBSTNode):
     def newnode(self, key, value):
         return AVLTreeNode(key, value)
 
+    def _updatelength(self):
+        BalancedBSTNode._updatelength(self)
+        self._updateheight()
+
     def _updateheight(self):
         self.height = 1 + max(height(self.left), height(self.right))
 
     def balance(self):
         return height(self.right) - height(self.left)
 
+    @staticmethod
+    def toobig(a, b):
+        return height(a) > height(b) + 1
+
     def rebalance(self):
         bal = self.balance()
         if bal == -2:
@@ -34,20 +38,7 @@ class AVLTreeNode(BalancedBSTNode):
             newroot = self.rotateleft()
         else:
             return self
-        update(newroot.left)
-        update(newroot.right)
-        update(newroot)
         return newroot
 
-    def put(self, key, value):
-        newroot = BalancedBSTNode.put(self, key, value)
-        update(newroot)
-        return newroot.rebalance()
-
-    def remove(self, key):
-        newroot = BalancedBSTNode.remove(self, key)
-        update(newroot)
-        return newroot.rebalance() if newroot else None
-
-class AVLTree(BalancedBST):
+class AVLTree(BalancedBST, JoinableBST):
     Node = AVLTreeNode
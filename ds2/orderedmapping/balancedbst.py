@@ -1,25 +1,29 @@
 from ds2.orderedmapping import BSTMapping, BSTNode
 
+def _issorted(items):
+    return all(items[i][0] < items[i + 1][0] for i in range(len(items) - 1))
+
 class BalancedBSTNode(BSTNode):
     def newnode(self, key, value):
         return BalancedBSTNode(key, value)
 
-    def put(self, key, value):
-        if key == self.key:
-            self.value = value
-        elif key < self.key:
-            if self.left:
-                self.left = self.left.put(key, value)
-            else:
-                self.left = self.newnode(key, value)
-        elif key > self.key:
-            if self.right:
-                self.right = self.right.put(key, value)
-            else:
-                self.right = self.newnode(key, value)
-        self._updatelength()
+    def rebalance(self):
         return self
 
+    def _fixpath(self, path):
+        newroot = None
+        for i in range(len(path) - 1, -1, -1):
+            node = path[i]
+            node._updatelength()
+            newroot = node.rebalance()
+            if i > 0 and newroot is not node:
+                parent = path[i - 1]
+                if parent.left is node:
+                    parent.left = newroot
+                else:
+                    parent.right = newroot
+        return newroot
+
     def rotateright(self):
         newroot = self.left
         self.left = newroot.right
@@ -44,3 +48,153 @@ class BalancedBST(BSTMapping):
             self._root = self._root.put(key, value)
         else:
             self._root = self.Node(key, value)
+
+    def _build(self, items, start, stop):
+        if start == stop:
+            return None
+        mid = (start + stop) // 2
+        node = self.Node(*items[mid])
+        node.left = self._build(items, start, mid)
+        node.right = self._build(items, mid + 1, stop)
+        node._updatelength()
+        return node
+
+    @classmethod
+    def from_sorted(cls, items):
+        items = list(items)
+        if not _issorted(items):
+            raise ValueError("keys must be strictly increasing")
+        M = cls()
+        M._root = M._build(items, 0, len(items))
+        return M
+
+    def update(self, items, sizehint = None):
+        if hasattr(items, 'items'):
+            items = items.items()
+        items = list(items)
+        if self._root is None and _issorted(items):
+            self._root = self._build(items, 0, len(items))
+        else:
+            BSTMapping.update(self, items)
+
+# Joins, splits and the set operations recurse once per level of the
+# tree, so they are only for trees that stay balanced.  The node class
+# must also have a static method toobig(a, b) that says when a is too
+# big to be a sibling of b.
+class JoinableNode:
+    @classmethod
+    def join(cls, left, mid, right):
+        # All keys in left < mid.key < all keys in right.
+        if cls.toobig(left, right):
+            left.right = cls.join(left.right, mid, right)
+            left._updatelength()
+            return left.rebalance()
+        if cls.toobig(right, left):
+            right.left = cls.join(left, mid, right.left)
+            right._updatelength()
+            return right.rebalance()
+        mid.left, mid.right = left, right
+        mid._updatelength()
+        return mid
+
+    @classmethod
+    def join2(cls, left, right):
+        if left is None:
+            return right
+        left, last = cls.splitlast(left)
+        return cls.join(left, last, right)
+
+    @classmethod
+    def splitlast(cls, node):
+        if node.right is None:
+            left = node.left
+            node.left = None
+            node._updatelength()
+            return left, node
+        right, last = cls.splitlast(node.right)
+        return cls.join(node.left, node, right), last
+
+    @classmethod
+    def split(cls, node, key):
+        # Return the trees of keys less than and greater than key, and the
+        # node with the key itself (or None).
+        if node is None:
+            return None, None, None
+        left, right = node.left, node.right
+        if key == node.key:
+            node.left = node.right = None
+            node._updatelength()
+            return left, node, right
+        elif key < node.key:
+            less, mid, greater = cls.split(left, key)
+            return less, mid, cls.join(greater, node, right)
+        else:
+            less, mid, greater = cls.split(right, key)
+            return cls.join(left, node, less), mid, greater
+
+    @classmethod
+    def union(cls, a, b):
+        # When a key is in both, the node from b is kept.
+        if a is None:
+            return b
+        if b is None:
+            return a
+        left, right = b.left, b.right
+        less, mid, greater = cls.split(a, b.key)
+        return cls.join(cls.union(less, left), b, cls.union(greater, right))
+
+    @classmethod
+    def intersection(cls, a, b):
+        # The nodes are taken from a.
+        if a is None or b is None:
+            return None
+        less, mid, greater = cls.split(a, b.key)
+        left = cls.intersection(less, b.left)
+        right = cls.intersection(greater, b.right)
+        if mid is None:
+            return cls.join2(left, right)
+        return cls.join(left, mid, right)
+
+    @classmethod
+    def difference(cls, a, b):
+        if a is None or b is None:
+            return a
+        less, mid, greater = cls.split(a, b.key)
+        left = cls.difference(less, b.left)
+        right = cls.difference(greater, b.right)
+        return cls.join2(left, right)
+
+class JoinableBST:
+    def _new(self, root):
+        M = type(self)()
+        M._root = root
+        return M
+
+    def _take(self, other):
+        if type(other) is not type(self):
+            raise TypeError("both trees must have the same type")
+        a, b = self._root, other._root
+        self._root = other._root = None
+        return a, b
+
+    def split(self, key):
+        less, mid, greater = self.Node.split(self._root, key)
+        self._root = None
+        if mid is not None:
+            greater = self.Node.join(None, mid, greater)
+        return self._new(less), self._new(greater)
+
+    def join(self, other):
+        if self._root and other._root:
+            if not self._root.maxnode().key < other._root.minnode().key:
+                raise ValueError("keys must all be less than those of other")
+        return self._new(self.Node.join2(*self._take(other)))
+
+    def union(self, other):
+        return self._new(self.Node.union(*self._take(other)))
+
+    def intersection(self, other):
+        return self._new(self.Node.intersection(*self._take(other)))
+
+    def difference(self, other):
+        return self._new(self.Node.difference(*self._take(other)))
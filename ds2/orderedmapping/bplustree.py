@@ -0,0 +1,255 @@
+from bisect import bisect_left, bisect_right
+from ds2.mapping import Mapping, Entry
+
+class _Leaf:
+    isleaf = True
+
+    def __init__(self, keys = None, values = None):
+        self.keys = keys if keys is not None else []
+        self.values = values if values is not None else []
+        # The leaves form a linked list in key order.
+        self.link = None
+
+    def split(self):
+        mid = len(self.keys) // 2
+        right = _Leaf(self.keys[mid:], self.values[mid:])
+        del self.keys[mid:]
+        del self.values[mid:]
+        right.link, self.link = self.link, right
+        return right, right.keys[0]
+
+class _Internal:
+    isleaf = False
+
+    def __init__(self, keys, children):
+        # Every key in children[i] is less than keys[i], and every key in
+        # children[i + 1] is greater than or equal to keys[i].
+        self.keys = keys
+        self.children = children
+
+    def split(self):
+        mid = len(self.keys) // 2
+        separator = self.keys[mid]
+        right = _Internal(self.keys[mid + 1:], self.children[mid + 1:])
+        del self.keys[mid:]
+        del self.children[mid + 1:]
+        return right, separator
+
+class BPlusTree(Mapping):
+    def __init__(self, order = 64):
+        if order < 3:
+            raise ValueError("order must be at least 3")
+        # A leaf holds at most order entries and an internal node has at
+        # most order children.  Nodes other than the root stay at least
+        # half full.
+        self._order = order
+        self._minkeys = order // 2
+        self._minchildren = (order + 1) // 2
+        # The first leaf never changes, so iteration can start there.
+        self._head = self._root = _Leaf()
+        self._length = 0
+
+    def _leaf(self, key):
+        node = self._root
+        while not node.isleaf:
+            node = node.children[bisect_right(node.keys, key)]
+        return node
+
+    def _path(self, key):
+        # Return the leaf for key along with the (node, index) pairs above it.
+        path = []
+        node = self._root
+        while not node.isleaf:
+            i = bisect_right(node.keys, key)
+            path.append((node, i))
+            node = node.children[i]
+        return node, path
+
+    def get(self, key):
+        leaf = self._leaf(key)
+        i = bisect_left(leaf.keys, key)
+        if i < len(leaf.keys) and leaf.keys[i] == key:
+            return leaf.values[i]
+        raise KeyError
+
+    def _lookup(self, key, default):
+        leaf = self._leaf(key)
+        i = bisect_left(leaf.keys, key)
+        if i < len(leaf.keys) and leaf.keys[i] == key:
+            return leaf.values[i]
+        return default
+
+    def put(self, key, value):
+        node, path = self._path(key)
+        i = bisect_left(node.keys, key)
+        if i < len(node.keys) and node.keys[i] == key:
+            node.values[i] = value
+            return
+        node.keys.insert(i, key)
+        node.values.insert(i, value)
+        self._length += 1
+        if len(node.keys) <= self._order:
+            return
+
+        # Split the overfull nodes, from the leaf up.
+        right, separator = node.split()
+        while path:
+            parent, i = path.pop()
+            parent.keys.insert(i, separator)
+            parent.children.insert(i + 1, right)
+            if len(parent.children) <= self._order:
+                return
+            right, separator = parent.split()
+        self._root = _Internal([separator], [self._root, right])
+
+    def remove(self, key):
+        node, path = self._path(key)
+        i = bisect_left(node.keys, key)
+        if i == len(node.keys) or node.keys[i] != key:
+            raise KeyError
+        del node.keys[i]
+        del node.values[i]
+        self._length -= 1
+
+        # Refill the underfull nodes, from the leaf up.
+        while path and self._underfull(node):
+            parent, i = path.pop()
+            self._refill(parent, i)
+            node = parent
+        if not self._root.isleaf and len(self._root.children) == 1:
+            self._root = self._root.children[0]
+
+    def _underfull(self, node):
+        if node.isleaf:
+            return len(node.keys) < self._minkeys
+        return len(node.children) < self._minchildren
+
+    def _refill(self, parent, i):
+        # Borrow from a sibling if it can spare an entry, otherwise merge.
+        node = parent.children[i]
+        if i > 0:
+            left = parent.children[i - 1]
+            if self._canspare(left):
+                self._borrowleft(parent, i, left, node)
+            else:
+                self._merge(parent, i - 1, left, node)
+        else:
+            right = parent.children[i + 1]
+            if self._canspare(right):
+                self._borrowright(parent, i, node, right)
+            else:
+                self._merge(parent, i, node, right)
+
+    def _canspare(self, node):
+        if node.isleaf:
+            return len(node.keys) > self._minkeys
+        return len(node.children) > self._minchildren
+
+    def _borrowleft(self, parent, i, left, node):
+        if node.isleaf:
+            node.keys.insert(0, left.keys.pop())
+            node.values.insert(0, left.values.pop())
+            parent.keys[i - 1] = node.keys[0]
+        else:
+            node.keys.insert(0, parent.keys[i - 1])
+            node.children.insert(0, left.children.pop())
+            parent.keys[i - 1] = left.keys.pop()
+
+    def _borrowright(self, parent, i, node, right):
+        if node.isleaf:
+            node.keys.append(right.keys.pop(0))
+            node.values.append(right.values.pop(0))
+            parent.keys[i] = right.keys[0]
+        else:
+            node.keys.append(parent.keys[i])
+            node.children.append(right.children.pop(0))
+            parent.keys[i] = right.keys.pop(0)
+
+    def _merge(self, parent, i, left, right):
+        # Move everything from right into left and drop right.
+        if left.isleaf:
+            left.values.extend(right.values)
+            left.link = right.link
+        else:
+            left.keys.append(parent.keys[i])
+            left.children.extend(right.children)
+        left.keys.extend(right.keys)
+        del parent.keys[i]
+        del parent.children[i + 1]
+
+    def floor(self, key):
+        return self._below(key, bisect_right)
+
+    def predecessor(self, key):
+        return self._below(key, bisect_left)
+
+    def ceiling(self, key):
+        return self._above(key, bisect_left)
+
+    def successor(self, key):
+        return self._above(key, bisect_right)
+
+    def _below(self, key, bisect):
+        # Remember the last place the search could have gone left instead.
+        node, fallback = self._root, None
+        while not node.isleaf:
+            i = bisect_right(node.keys, key)
+            if i > 0:
+                fallback = node.children[i - 1]
+            node = node.children[i]
+        i = bisect(node.keys, key)
+        if i == 0:
+            if fallback is None:
+                return None, None
+            node = fallback
+            while not node.isleaf:
+                node = node.children[-1]
+            i = len(node.keys)
+        return node.keys[i - 1], node.values[i - 1]
+
+    def _above(self, key, bisect):
+        node = self._leaf(key)
+        i = bisect(node.keys, key)
+        if i == len(node.keys):
+            node, i = node.link, 0
+            if node is None:
+                return None, None
+        return node.keys[i], node.values[i]
+
+    def range(self, lo, hi):
+        node = self._leaf(lo)
+        i = bisect_left(node.keys, lo)
+        while node is not None:
+            keys, values = node.keys, node.values
+            while i < len(keys):
+                if not keys[i] < hi:
+                    return
+                yield keys[i], values[i]
+                i += 1
+            node, i = node.link, 0
+
+    def __len__(self):
+        return self._length
+
+    def _leaves(self):
+        node = self._head
+        while node is not None:
+            yield node
+            node = node.link
+
+    def _entryiter(self):
+        for leaf in self._leaves():
+            for key, value in zip(leaf.keys, leaf.values):
+                yield Entry(key, value)
+
+    def __iter__(self):
+        for leaf in self._leaves():
+            yield from leaf.keys
+
+    def values(self):
+        for leaf in self._leaves():
+            yield from leaf.values
+
+    def items(self):
+        for leaf in self._leaves():
+            yield from zip(leaf.keys, leaf.values)
@@ -1,4 +1,5 @@
 from ds2.mapping import Mapping
+from ds2.orderedmapping.eytzingermapping import EytzingerMapping
 
 class BSTMapping(Mapping):
     def __init__(self):
@@ -11,7 +12,7 @@ class BSTMapping(Mapping):
 
     def put(self, key, value):
         if self._root:
-            self.root = self._root.put(key, value)
+            self._root = self._root.put(key, value)
         else:
             self._root = BSTNode(key, value)
 
@@ -38,6 +39,63 @@ class BSTMapping(Mapping):
     def __delitem__(self, key):
         self.remove(key)
 
+    def _keyvalue(self, node):
+        if node is not None:
+            return node.key, node.value
+        return None, None
+
+    def ceiling(self, key):
+        if self._root:
+            return self._keyvalue(self._root.ceiling(key))
+        return None, None
+
+    def predecessor(self, key):
+        if self._root:
+            return self._keyvalue(self._root.predecessor(key))
+        return None, None
+
+    def successor(self, key):
+        if self._root:
+            return self._keyvalue(self._root.successor(key))
+        return None, None
+
+    def rank(self, key):
+        return self._root.rank(key) if self._root else 0
+
+    def select(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError
+        return self._keyvalue(self._root.select(i))
+
+    def count_range(self, lo, hi):
+        return max(0, self.rank(hi) - self.rank(lo))
+
+    def range(self, lo, hi):
+        if self._root:
+            for node in self._root.range(lo, hi):
+                yield node.key, node.value
+
+    def cursor(self, key = None):
+        cursor = BSTCursor(self._root)
+        if key is not None:
+            cursor.seek(key)
+        return cursor
+
+    def freeze(self):
+        return EytzingerMapping(self.items())
+
+    def __reversed__(self):
+        cursor = self.cursor()
+        cursor.seekend()
+        while True:
+            try:
+                key, value = cursor.prev()
+            except StopIteration:
+                return
+            yield key
+
 class BSTNode:
     def __init__(self, key, value):
         self.key = key
@@ -46,6 +104,9 @@ class BSTNode:
         self.right = None
         self._length = 1
 
+    def newnode(self, key, value):
+        return BSTNode(key, value)
+
     def __len__(self):
         return self._length
 
@@ -53,29 +114,33 @@ class BSTNode:
         return str(self.key) + " : " + str(self.value)
 
     def get(self, key):
-        if key == self.key:
-            return self
-        elif key < self.key and self.left:
-            return self.left.get(key)
-        elif key > self.key and self.right:
-            return self.right.get(key)
-        else:
-            raise KeyError
+        node = self
+        while node is not None:
+            if key == node.key:
+                return node
+            node = node.left if key < node.key else node.right
+        raise KeyError
 
     def put(self, key, value):
-        if key == self.key:
-            self.value = value
-        elif key < self.key:
-            if self.left:
-                self.left.put(key, value)
-            else:
-                self.left = BSTNode(key, value)
-        elif key > self.key:
-            if self.right:
-                self.right.put(key, value)
-            else:
-                self.right = BSTNode(key, value)
-        self._updatelength()
+        path = []
+        node = self
+        while node is not None:
+            if key == node.key:
+                node.value = value
+                return self
+            path.append(node)
+            node = node.left if key < node.key else node.right
+        parent = path[-1]
+        if key < parent.key:
+            parent.left = self.newnode(key, value)
+        else:
+            parent.right = self.newnode(key, value)
+        return self._fixpath(path)
+
+    def _fixpath(self, path):
+        for node in reversed(path):
+            node._updatelength()
+        return self
 
     def _updatelength(self):
         len_left = len(self.left) if self.left else 0
@@ -83,44 +148,220 @@ class BSTNode:
         self._length = 1 + len_left + len_right
 
     def floor(self, key):
-        if key == self.key:
-            return self
-        elif key < self.key:
-            if self.left is not None:
-                return self.left.floor(key)
-            else:
-                return None
-        elif key > self.key:
-            if self.right is not None:
-                floor = self.right.floor(key)
-                return floor if floor is not None else self
+        node, floor = self, None
+        while node is not None:
+            if key == node.key:
+                return node
+            elif key < node.key:
+                node = node.left
             else:
-                return self
+                floor = node
+                node = node.right
+        return floor
 
     def __iter__(self):
-        if self.left is not None:
-            yield from self.left
-        yield self
-        if self.right is not None:
-            yield from self.right
+        stack = []
+        node = self
+        while stack or node is not None:
+            if node is not None:
+                stack.append(node)
+                node = node.left
+            else:
+                node = stack.pop()
+                yield node
+                node = node.right
 
     def _swapwith(self, other):
         self.key, other.key = other.key, self.key
         self.value, other.value = other.value, self.value
 
     def maxnode(self):
-        return self.right.maxnode() if self.right else self
+        node = self
+        while node.right:
+            node = node.right
+        return node
+
+    def minnode(self):
+        node = self
+        while node.left:
+            node = node.left
+        return node
 
     def remove(self, key):
-        if key == self.key:
-            if self.left is None: return self.right
-            if self.right is None: return self.left
-            self._swapwith(self.left.maxnode())
-            self.left = self.left.remove(key)
-        elif key < self.key and self.left:
-            self.left = self.left.remove(key)
-        elif key > self.key and self.right:
-            self.right = self.right.remove(key)
-        else: raise KeyError
-        self._updatelength()
+        path = []
+        node = self
+        while node is not None and key != node.key:
+            path.append(node)
+            node = node.left if key < node.key else node.right
+        if node is None: raise KeyError
+        if node.left is not None and node.right is not None:
+            path.append(node)
+            target = node.left
+            while target.right is not None:
+                path.append(target)
+                target = target.right
+            node._swapwith(target)
+            node = target
+        child = node.left if node.left is not None else node.right
+        if not path: return child
+        parent = path[-1]
+        if parent.left is node:
+            parent.left = child
+        else:
+            parent.right = child
+        return self._fixpath(path)
+
+    def ceiling(self, key):
+        node, ceiling = self, None
+        while node is not None:
+            if key == node.key:
+                return node
+            elif key > node.key:
+                node = node.right
+            else:
+                ceiling = node
+                node = node.left
+        return ceiling
+
+    def predecessor(self, key):
+        node, predecessor = self, None
+        while node is not None:
+            if node.key < key:
+                predecessor = node
+                node = node.right
+            else:
+                node = node.left
+        return predecessor
+
+    def successor(self, key):
+        node, successor = self, None
+        while node is not None:
+            if node.key > key:
+                successor = node
+                node = node.left
+            else:
+                node = node.right
+        return successor
+
+    def rank(self, key):
+        node, rank = self, 0
+        while node is not None:
+            if key <= node.key:
+                node = node.left
+            else:
+                rank += 1 + (len(node.left) if node.left else 0)
+                node = node.right
+        return rank
+
+    def select(self, i):
+        node = self
+        while node is not None:
+            len_left = len(node.left) if node.left else 0
+            if i < len_left:
+                node = node.left
+            elif i == len_left:
+                return node
+            else:
+                i -= len_left + 1
+                node = node.right
+        raise IndexError
+
+    def range(self, lo, hi):
+        stack = []
+        node = self
+        while stack or node is not None:
+            if node is not None:
+                if node.key < lo:
+                    node = node.right
+                else:
+                    stack.append(node)
+                    node = node.left
+            else:
+                node = stack.pop()
+                if not node.key < hi:
+                    return
+                yield node
+                node = node.right
+
+class BSTCursor:
+    def __init__(self, root):
+        self._root = root
+        self._path = []
+        self.seek(None)
+
+    def seek(self, key):
+        # Stop at the smallest key >= key, or the smallest key if key is None.
+        self._path = []
+        depth = 0
+        node = self._root
+        while node is not None:
+            self._path.append(node)
+            if key is None or not node.key < key:
+                depth = len(self._path)
+                node = node.left
+            else:
+                node = node.right
+        del self._path[depth:]
+
+    def seekend(self):
+        self._path = []
+
+    def hasnext(self):
+        return len(self._path) > 0
+
+    def hasprev(self):
+        if self._path:
+            node = self._path[-1]
+            return node.left is not None or any(
+                parent.right is child
+                for parent, child in zip(self._path, self._path[1:]))
+        return self._root is not None
+
+    def next(self):
+        if not self._path:
+            raise StopIteration
+        path = self._path
+        node = path[-1]
+        if node.right is not None:
+            child = node.right
+            path.append(child)
+            while child.left is not None:
+                child = child.left
+                path.append(child)
+        else:
+            child = path.pop()
+            while path and path[-1].right is child:
+                child = path.pop()
+        return node.key, node.value
+
+    def prev(self):
+        path = self._path
+        if not path:
+            if self._root is None:
+                raise StopIteration
+            node = self._root
+            path.append(node)
+            while node.right is not None:
+                node = node.right
+                path.append(node)
+        elif path[-1].left is not None:
+            node = path[-1].left
+            path.append(node)
+            while node.right is not None:
+                node = node.right
+                path.append(node)
+        else:
+            for i in range(len(path) - 1, 0, -1):
+                if path[i - 1].right is path[i]:
+                    del path[i:]
+                    break
+            else:
+                raise StopIteration
+        node = path[-1]
+        return node.key, node.value
+
+    def __iter__(self):
         return self
+
+    def __next__(self):
+        return self.next()
@@ -0,0 +1,105 @@
+from ds2.mapping import Mapping, Entry
+
+# The keys are stored in the order of a breadth first traversal of a
+# perfectly balanced BST, starting at index 1.  The children of index k
+# are at 2k and 2k + 1, so a search just doubles the index at each step
+# and there are no node objects at all.
+
+class EytzingerMapping(Mapping):
+    def __init__(self, items = ()):
+        items = list(items)
+        for i in range(len(items) - 1):
+            if not items[i][0] < items[i + 1][0]:
+                raise ValueError("keys must be strictly increasing")
+        self._length = len(items)
+        self._keys = [None] * (self._length + 1)
+        self._values = [None] * (self._length + 1)
+        self._fill(items, 1, 0)
+
+    def _fill(self, items, k, i):
+        # Place the items in an inorder traversal of the implicit tree.
+        # Return the index of the next item to place.
+        if k <= self._length:
+            i = self._fill(items, 2 * k, i)
+            self._keys[k], self._values[k] = items[i]
+            i = self._fill(items, 2 * k + 1, i + 1)
+        return i
+
+    def _ceilingindex(self, key):
+        # Go right exactly when the key is bigger, without other branches.
+        keys, n, k = self._keys, self._length, 1
+        while k <= n:
+            k = 2 * k + (keys[k] < key)
+        # The answer is where the search last went left.
+        return k >> (~k & (k + 1)).bit_length()
+
+    def _floorindex(self, key):
+        keys, n, k = self._keys, self._length, 1
+        while k <= n:
+            k = 2 * k + (keys[k] <= key)
+        # The answer is where the search last went right.
+        return k >> (k & -k).bit_length()
+
+    def _next(self, k):
+        # The index of the next key in sorted order, or 0.
+        if 2 * k + 1 <= self._length:
+            k = 2 * k + 1
+            while 2 * k <= self._length:
+                k = 2 * k
+            return k
+        return k >> (~k & (k + 1)).bit_length()
+
+    def get(self, key):
+        k = self._ceilingindex(key)
+        if k and self._keys[k] == key:
+            return self._values[k]
+        raise KeyError
+
+    def _lookup(self, key, default):
+        k = self._ceilingindex(key)
+        if k and self._keys[k] == key:
+            return self._values[k]
+        return default
+
+    def put(self, key, value):
+        raise TypeError("an EytzingerMapping cannot be changed")
+
+    def remove(self, key):
+        raise TypeError("an EytzingerMapping cannot be changed")
+
+    def __len__(self):
+        return self._length
+
+    def floor(self, key):
+        k = self._floorindex(key)
+        return (self._keys[k], self._values[k]) if k else (None, None)
+
+    def ceiling(self, key):
+        k = self._ceilingindex(key)
+        return (self._keys[k], self._values[k]) if k else (None, None)
+
+    def range(self, lo, hi):
+        keys, values = self._keys, self._values
+        k = self._ceilingindex(lo)
+        while k and keys[k] < hi:
+            yield keys[k], values[k]
+            k = self._next(k)
+
+    def _indices(self):
+        if self._length == 0:
+            return
+        k = 1
+        while 2 * k <= self._length:
+            k = 2 * k
+        while k:
+            yield k
+            k = self._next(k)
+
+    def _entryiter(self):
+        return (Entry(self._keys[k], self._values[k]) for k in self._indices())
+
+    def __iter__(self):
+        return (self._keys[k] for k in self._indices())
+
+    def items(self):
+        return ((self._keys[k], self._values[k]) for k in self._indices())
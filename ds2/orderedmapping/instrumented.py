@@ -0,0 +1,213 @@
+# Counting is done in subclasses made by instrumented(), so the plain
+# tree classes do no extra work, apart from one empty call for each
+# rotation in a splay.
+
+class TreeStats:
+    # The default hook.  A hook can be any object with these three methods.
+    def __init__(self):
+        self.operations = dict.fromkeys(_OPERATIONS, 0)
+        self.rotations = 0
+        self.updaterotations = 0
+        self.visited = 0
+        self.comparisons = 0
+
+    # Called for every single rotation.
+    def rotation(self):
+        self.rotations += 1
+
+    # Called after each operation with the number of different nodes it
+    # touched and the number of times it read a key.  Every comparison
+    # reads a key, and so do the few steps that copy or return one.
+    def search(self, visited, comparisons):
+        self.visited += visited
+        self.comparisons += comparisons
+
+    # Called after each operation with the number of rotations it did.
+    def operation(self, name, rotations):
+        self.operations[name] += 1
+        if name in ('put', 'remove'):
+            self.updaterotations += rotations
+
+    def stats(self):
+        operations = sum(self.operations.values())
+        updates = self.operations['put'] + self.operations['remove']
+        return {'gets': self.operations['get'],
+                'puts': self.operations['put'],
+                'removes': self.operations['remove'],
+                'queries': operations - updates - self.operations['get'],
+                'rotations': self.rotations,
+                'rotations_per_update':
+                    self.updaterotations / updates if updates else 0,
+                'nodes_visited': self.visited,
+                'comparisons': self.comparisons,
+                'average_path':
+                    self.visited / operations if operations else 0,
+                }
+
+_OPERATIONS = ('get', 'put', 'remove',
+               'floor', 'ceiling', 'predecessor', 'successor', 'range')
+
+class _Operation:
+    # What the running operation has done so far.
+    def __init__(self, hook):
+        self.hook = hook
+        self.rotations = 0
+        self.comparisons = 0
+        self.visited = set()
+
+def _height(root):
+    height = -1
+    stack = [(root, 0)] if root is not None else []
+    while stack:
+        node, depth = stack.pop()
+        height = max(height, depth)
+        for child in (node.left, node.right):
+            if child is not None:
+                stack.append((child, depth + 1))
+    return height
+
+def _instrumentednode(base):
+    class InstrumentedNode(base):
+        # The operation that is running, if any.  Nodes move between trees
+        # in the set operations, so everything is reported to the tree
+        # whose operation is running, not to the tree that made the node.
+        # Outside of an operation the nodes count nothing.
+        operation = None
+
+        def newnode(self, key, value):
+            return type(self)(key, value)
+
+        # The key and the links are read through properties, so the counts
+        # come from the steps the operation really takes.
+        @property
+        def key(self):
+            operation = InstrumentedNode.operation
+            if operation is not None:
+                operation.comparisons += 1
+                operation.visited.add(self)
+            return self._key
+
+        @key.setter
+        def key(self, key):
+            self._key = key
+
+        @property
+        def left(self):
+            operation = InstrumentedNode.operation
+            if operation is not None:
+                operation.visited.add(self)
+            return self._left
+
+        @left.setter
+        def left(self, left):
+            self._left = left
+
+        @property
+        def right(self):
+            operation = InstrumentedNode.operation
+            if operation is not None:
+                operation.visited.add(self)
+            return self._right
+
+        @right.setter
+        def right(self, right):
+            self._right = right
+
+        def _rotated(self):
+            operation = InstrumentedNode.operation
+            if operation is not None:
+                operation.rotations += 1
+                operation.hook.rotation()
+
+        def rotateright(self):
+            self._rotated()
+            return base.rotateright(self)
+
+        def rotateleft(self):
+            self._rotated()
+            return base.rotateleft(self)
+
+        # Splaying does its rotations inline and reports each one here.
+        _splayrotation = _rotated
+
+    return InstrumentedNode
+
+def instrumented(treeclass):
+    # Return a subclass of a BalancedBST class that reports to a hook.
+    class InstrumentedTree(treeclass):
+        Node = _instrumentednode(treeclass.Node)
+
+        def __init__(self, hook = None):
+            treeclass.__init__(self)
+            self.hook = hook if hook is not None else TreeStats()
+
+        def _run(self, operation, function, *args):
+            Node = self.Node
+            outer, Node.operation = Node.operation, operation
+            try:
+                return function(*args)
+            finally:
+                Node.operation = outer
+
+        def _report(self, name, operation):
+            self.hook.search(len(operation.visited), operation.comparisons)
+            self.hook.operation(name, operation.rotations)
+
+        def _instrument(self, name, function, *args):
+            operation = _Operation(self.hook)
+            try:
+                return self._run(operation, function, self, *args)
+            finally:
+                self._report(name, operation)
+
+        def get(self, key):
+            return self._instrument('get', treeclass.get, key)
+
+        def _lookup(self, key, default):
+            # Go through get, so that each lookup is counted once.
+            try:
+                return self.get(key)
+            except KeyError:
+                return default
+
+        def put(self, key, value):
+            self._instrument('put', treeclass.put, key, value)
+
+        def remove(self, key):
+            self._instrument('remove', treeclass.remove, key)
+
+        def floor(self, key):
+            return self._instrument('floor', treeclass.floor, key)
+
+        def ceiling(self, key):
+            return self._instrument('ceiling', treeclass.ceiling, key)
+
+        def predecessor(self, key):
+            return self._instrument('predecessor', treeclass.predecessor, key)
+
+        def successor(self, key):
+            return self._instrument('successor', treeclass.successor, key)
+
+        def range(self, lo, hi):
+            # Count each step of the walk as it is taken, and report them
+            # all when the walk ends or the caller stops early.
+            operation = _Operation(self.hook)
+            items = treeclass.range(self, lo, hi)
+            try:
+                while True:
+                    try:
+                        item = self._run(operation, next, items)
+                    except StopIteration:
+                        return
+                    yield item
+            finally:
+                self._report('range', operation)
+
+        def stats(self):
+            stats = self.hook.stats() if hasattr(self.hook, 'stats') else {}
+            stats['height'] = _height(self._root)
+            stats['length'] = len(self)
+            return stats
+
+    InstrumentedTree.__name__ = 'Instrumented' + treeclass.__name__
+    return InstrumentedTree
@@ -0,0 +1,39 @@
+from ds2.orderedmapping.avltree import AVLTree
+from ds2.orderedmapping.augmented import augmented, Monoid, MAX
+
+# The keys are closed intervals (start, end), ordered by start and then
+# by end.  Each node also keeps the largest end in its subtree.
+
+def _end(key, value):
+    return key[1]
+
+class IntervalTree(augmented(AVLTree, end = Monoid(MAX.combine, None, _end))):
+    def put(self, key, value):
+        start, end = key
+        if end < start:
+            raise ValueError("an interval cannot end before it starts")
+        super().put((start, end), value)
+
+    def overlapping(self, start, end):
+        # Yield the intervals that share a point with [start, end], in
+        # order.  A subtree is skipped when nothing in it reaches start,
+        # and the search stops at the first interval after end.
+        # This visits O(k log(n/k) + log n) nodes for k results.  When the
+        # results are next to each other in key order, it is O(log n + k).
+        stack, node = [], self._root
+        while True:
+            while node is not None and not node.aggregates[0] < start:
+                stack.append(node)
+                node = node.left
+            if not stack:
+                return
+            node = stack.pop()
+            if end < node.key[0]:
+                return
+            if not node.key[1] < start:
+                yield node.key, node.value
+            node = node.right
+
+    def stab(self, point):
+        # The intervals that contain point.
+        return self.overlapping(point, point)
@@ -0,0 +1,87 @@
+from ds2.orderedmapping import BSTMapping, BSTNode
+from ds2.orderedmapping.avltree import height
+
+class PersistentAVLNode(BSTNode):
+    # Nodes are never changed after they are made, so any number of trees
+    # can share them.  Every update builds new nodes along the search path.
+    def __init__(self, key, value, left = None, right = None):
+        BSTNode.__init__(self, key, value)
+        self.left = left
+        self.right = right
+        self._updatelength()
+        self.height = 1 + max(height(left), height(right))
+
+    @classmethod
+    def balanced(cls, key, value, left, right):
+        # Build a node from subtrees whose heights differ by at most two.
+        if height(left) > height(right) + 1:
+            if height(left.left) < height(left.right):
+                mid = left.right
+                return cls(mid.key, mid.value,
+                           cls(left.key, left.value, left.left, mid.left),
+                           cls(key, value, mid.right, right))
+            return cls(left.key, left.value, left.left,
+                       cls(key, value, left.right, right))
+        if height(right) > height(left) + 1:
+            if height(right.right) < height(right.left):
+                mid = right.left
+                return cls(mid.key, mid.value,
+                           cls(key, value, left, mid.left),
+                           cls(right.key, right.value, mid.right, right.right))
+            return cls(right.key, right.value,
+                       cls(key, value, left, right.left), right.right)
+        return cls(key, value, left, right)
+
+    def put(self, key, value):
+        if key == self.key:
+            return type(self)(self.key, value, self.left, self.right)
+        elif key < self.key:
+            if self.left:
+                left = self.left.put(key, value)
+            else:
+                left = type(self)(key, value)
+            return self.balanced(self.key, self.value, left, self.right)
+        else:
+            if self.right:
+                right = self.right.put(key, value)
+            else:
+                right = type(self)(key, value)
+            return self.balanced(self.key, self.value, self.left, right)
+
+    def remove(self, key):
+        if key == self.key:
+            if self.left is None:
+                return self.right
+            if self.right is None:
+                return self.left
+            left, last = self.left.removemax()
+            return self.balanced(last.key, last.value, left, self.right)
+        elif key < self.key:
+            if self.left is None: raise KeyError
+            left = self.left.remove(key)
+            return self.balanced(self.key, self.value, left, self.right)
+        else:
+            if self.right is None: raise KeyError
+            right = self.right.remove(key)
+            return self.balanced(self.key, self.value, self.left, right)
+
+    def removemax(self):
+        # Return the tree without its largest node, and that node.
+        if self.right is None:
+            return self.left, self
+        right, last = self.right.removemax()
+        return self.balanced(self.key, self.value, self.left, right), last
+
+class PersistentAVLTree(BSTMapping):
+    def put(self, key, value):
+        if self._root:
+            self._root = self._root.put(key, value)
+        else:
+            self._root = PersistentAVLNode(key, value)
+
+    def snapshot(self):
+        # The snapshot shares every node, and later changes to either
+        # tree do not affect the other.
+        M = PersistentAVLTree()
+        M._root = self._root
+        return M
@@ -0,0 +1,143 @@
+import random
+import threading
+from ds2.mapping import Mapping, Entry
+
+# Readers take no lock.  A writer changes the list only by replacing one
+# forward link at a time, and always so that every link still points
+# further along a sorted list.  So a reader in another thread may miss a
+# change that happens while it walks, but never sees a broken list.
+# Writers hold a lock, so there is only one at a time.
+
+MAXHEIGHT = 32
+
+class _SkipNode:
+    def __init__(self, key, value, height):
+        self.key = key
+        self.value = value
+        self.next = [None] * height
+
+def _randomheight():
+    # Each level is in the next one up with probability 1/2.
+    bits = random.getrandbits(MAXHEIGHT - 1) | (1 << (MAXHEIGHT - 1))
+    return (bits & -bits).bit_length()
+
+class SkipList(Mapping):
+    def __init__(self):
+        self._head = _SkipNode(None, None, MAXHEIGHT)
+        self._height = 1
+        self._length = 0
+        self._lock = threading.Lock()
+
+    def _before(self, key):
+        # The last node with a key less than key, or the head.
+        node = self._head
+        for level in reversed(range(self._height)):
+            other = node.next[level]
+            while other is not None and other.key < key:
+                node, other = other, other.next[level]
+        return node
+
+    def _upto(self, key):
+        # The last node with a key less than or equal to key, or the head.
+        node = self._head
+        for level in reversed(range(self._height)):
+            other = node.next[level]
+            while other is not None and not key < other.key:
+                node, other = other, other.next[level]
+        return node
+
+    def _path(self, key):
+        # The last node before key on every level, for writers.
+        path = [self._head] * MAXHEIGHT
+        node = self._head
+        for level in reversed(range(self._height)):
+            other = node.next[level]
+            while other is not None and other.key < key:
+                node, other = other, other.next[level]
+            path[level] = node
+        return path
+
+    def get(self, key):
+        node = self._before(key).next[0]
+        if node is not None and node.key == key:
+            return node.value
+        raise KeyError
+
+    def _lookup(self, key, default):
+        node = self._before(key).next[0]
+        if node is not None and node.key == key:
+            return node.value
+        return default
+
+    def put(self, key, value):
+        with self._lock:
+            path = self._path(key)
+            node = path[0].next[0]
+            if node is not None and node.key == key:
+                node.value = value
+                return
+            node = _SkipNode(key, value, _randomheight())
+            # Fill in the new node before anything links to it, then link
+            # it from the bottom up.
+            for level in range(len(node.next)):
+                node.next[level] = path[level].next[level]
+            for level in range(len(node.next)):
+                path[level].next[level] = node
+            self._height = max(self._height, len(node.next))
+            self._length += 1
+
+    def remove(self, key):
+        with self._lock:
+            path = self._path(key)
+            node = path[0].next[0]
+            if node is None or node.key != key:
+                raise KeyError
+            # Unlink from the top down.  The links of the removed node stay
+            # as they are, so a reader standing on it can go on.
+            for level in reversed(range(len(node.next))):
+                path[level].next[level] = node.next[level]
+            self._length -= 1
+
+    def __len__(self):
+        return self._length
+
+    def _item(self, node):
+        if node is None or node is self._head:
+            return None, None
+        return node.key, node.value
+
+    def floor(self, key):
+        return self._item(self._upto(key))
+
+    def predecessor(self, key):
+        return self._item(self._before(key))
+
+    def ceiling(self, key):
+        return self._item(self._before(key).next[0])
+
+    def successor(self, key):
+        return self._item(self._upto(key).next[0])
+
+    def range(self, lo, hi):
+        node = self._before(lo).next[0]
+        while node is not None and node.key < hi:
+            yield node.key, node.value
+            node = node.next[0]
+
+    def _nodes(self):
+        node = self._head.next[0]
+        while node is not None:
+            yield node
+            node = node.next[0]
+
+    def _entryiter(self):
+        return (Entry(node.key, node.value) for node in self._nodes())
+
+    def __iter__(self):
+        return (node.key for node in self._nodes())
+
+    def values(self):
+        return (node.value for node in self._nodes())
+
+    def items(self):
+        return ((node.key, node.value) for node in self._nodes())
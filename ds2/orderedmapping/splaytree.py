@@ -4,52 +4,132 @@ class SplayTreeNode(BalancedBSTNode):
     def newnode(self, key, value):
         return SplayTreeNode(key, value)
 
-    def splayup(self, key):
-        newroot = self
-        if key < self.key:
-            if key < self.left.key:
-                newroot = self.rotateright().rotateright()
-            elif key > self.left.key:
-                self.left = self.left.rotateleft()
-                newroot = self.rotateright()
-        elif key > self.key:
-            if key > self.right.key:
-                newroot = self.rotateleft().rotateleft()
-            elif key < self.right.key:
-                self.right = self.right.rotateright()
-                newroot = self.rotateleft()
-        return newroot
+    def splay(self, key):
+        # Returns the new root.
+        # The nodes in smaller and larger will form the left and right trees.
+        smaller, larger = [], []
+        node = self
+        while True:
+            if key < node.key:
+                child = node.left
+                if child is None:
+                    break
+                if key < child.key:
+                    # Rotate right.  The length of child is fixed below.
+                    node.left = child.right
+                    child.right = node
+                    node._updatelength()
+                    node._splayrotation()
+                    node = child
+                    if node.left is None:
+                        break
+                larger.append(node)
+                node = node.left
+            elif key > node.key:
+                child = node.right
+                if child is None:
+                    break
+                if key > child.key:
+                    node.right = child.left
+                    child.left = node
+                    node._updatelength()
+                    node._splayrotation()
+                    node = child
+                    if node.right is None:
+                        break
+                smaller.append(node)
+                node = node.right
+            else:
+                break
+        if not smaller and not larger:
+            # A single rotation may still have changed the root.
+            node._updatelength()
+            return node
 
-    def put(self, key, value):
-        newroot = BalancedBSTNode.put(self, key, value)
-        return newroot.splayup(key)
+        # Reassemble the tree with node at the root.
+        if smaller:
+            for i in range(len(smaller) - 1):
+                smaller[i].right = smaller[i + 1]
+            smaller[-1].right = node.left
+            node.left = smaller[0]
+        if larger:
+            for i in range(len(larger) - 1):
+                larger[i].left = larger[i + 1]
+            larger[-1].left = node.right
+            node.right = larger[0]
+        self._updatelengths(smaller)
+        self._updatelengths(larger)
+        node._updatelength()
+        return node
 
-    def get(self, key):
-        if key == self.key:
-            return self
-        elif key < self.key and self.left:
-            self.left = self.left.get(key)
-        elif key > self.key and self.right:
-            self.right = self.right.get(key)
-        else:
-            raise KeyError
-        return self.splayup(key)
+    # Called for each rotation that splay does inline.  It does nothing
+    # here, but a subclass can count them.
+    def _splayrotation(self):
+        pass
+
+    def _updatelengths(self, nodes):
+        # Fix the lengths from the bottom up.  This is the hot loop, so it
+        # reads the lengths directly instead of calling _updatelength.
+        for node in reversed(nodes):
+            left, right = node.left, node.right
+            node._length = (1 + (left._length if left is not None else 0)
+                            + (right._length if right is not None else 0))
 
 class SplayTree(BalancedBST):
     Node = SplayTreeNode
 
-    def splayup(self, key):
-        if key < self._root.key:
-            self._root = self._root.rotateright()
-        if key > self._root.key:
-            self._root = self._root.rotateleft()
+    def _splay(self, key):
+        self._root = self._root.splay(key)
+        return self._root.key == key
 
     def get(self, key):
-        if self._root is None: raise KeyError
-        self._root = self._root.get(key)
-        self.splayup(key)
+        if self._root is None or not self._splay(key):
+            raise KeyError
+        return self._root.value
+
+    def _lookup(self, key, default):
+        if self._root is None or not self._splay(key):
+            return default
         return self._root.value
 
     def put(self, key, value):
-        BalancedBST.put(self, key, value)
-        self.splayup(key)
+        if self._root is None:
+            self._root = self.Node(key, value)
+        elif self._splay(key):
+            self._root.value = value
+        else:
+            root, node = self._root, self.Node(key, value)
+            if key < root.key:
+                node.left, root.left = root.left, None
+                node.right = root
+            else:
+                node.right, root.right = root.right, None
+                node.left = root
+            root._updatelength()
+            node._updatelength()
+            self._root = node
+
+    def remove(self, key):
+        if self._root is None or not self._splay(key):
+            raise KeyError
+        root = self._root
+        if root.left is None:
+            self._root = root.right
+        else:
+            # The largest key on the left has no right child.
+            newroot = root.left.splay(key)
+            newroot.right = root.right
+            newroot._updatelength()
+            self._root = newroot
+
+    def floor(self, key):
+        if self._root is None:
+            return None, None
+        self._splay(key)
+        root = self._root
+        if key < root.key:
+            if root.left is None:
+                return None, None
+            root.left = root.left.splay(key)
+            return root.left.key, root.left.value
+        return root.key, root.value
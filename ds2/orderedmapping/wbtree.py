@@ -1,6 +1,7 @@
-from ds2.orderedmapping import BalancedBST, BalancedBSTNode
+from ds2.orderedmapping import (BalancedBST, BalancedBSTNode, JoinableBST,
+                                JoinableNode)
 
-class WBTreeNode(BalancedBSTNode):
+class WBTreeNode(BalancedBSTNode, JoinableNode):
     def newnode(self, key, value):
         return WBTreeNode(key, value)
 
@@ -8,6 +9,14 @@ class WBTreeNode(BalancedBSTNode):
         otherlength = len(other) if other else 0
         return len(self) + 1 >= 4 * (otherlength + 1)
 
+    @staticmethod
+    def toobig(a, b):
+        # Would b be too light to be a sibling of a?
+        if a is None:
+            return False
+        blength = len(b) if b else 0
+        return len(a) + blength + 2 >= 4 * (blength + 1)
+
     def rebalance(self):
         if self.toolight(self.left):
             if self.toolight(self.right.right):
@@ -21,13 +30,5 @@ class WBTreeNode(BalancedBSTNode):
             return self
         return newroot
 
-    def put(self, key, value):
-        newroot = BalancedBSTNode.put(self, key, value)
-        return newroot.rebalance()
-
-    def remove(self, key):
-        newroot = BalancedBSTNode.remove(self, key)
-        return newroot.rebalance() if newroot else None
-
-class WBTree(BalancedBST):
+class WBTree(BalancedBST, JoinableBST):
     Node = WBTreeNode
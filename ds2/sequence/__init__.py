@@ -0,0 +1 @@
+from ds2.sequence.treesequence import TreeSequence
@@ -0,0 +1,151 @@
+from itertools import chain
+from ds2.orderedmapping import AVLTreeNode
+
+# A list stored in a balanced tree.  The position of an item is not kept
+# anywhere.  It is found from the lengths of the subtrees on the way down,
+# so inserting or removing an item does not move any other item.  The
+# nodes have no keys, and only the rotations and joins of the balanced
+# tree are used, never its searches.
+
+def _len(node):
+    return len(node) if node is not None else 0
+
+class TreeSequence:
+    # Any balanced tree node class with join will do.
+    Node = AVLTreeNode
+
+    def __init__(self, items = ()):
+        items = list(items)
+        self._root = self._build(items, 0, len(items))
+
+    def _build(self, items, start, stop):
+        if start == stop:
+            return None
+        mid = (start + stop) // 2
+        node = self.Node(None, items[mid])
+        node.left = self._build(items, start, mid)
+        node.right = self._build(items, mid + 1, stop)
+        node._updatelength()
+        return node
+
+    def _new(self, root):
+        S = type(self)()
+        S._root = root
+        return S
+
+    def _split(self, node, i):
+        # Return the trees of the first i items and of the rest.
+        if node is None:
+            return None, None
+        left, right = node.left, node.right
+        if i <= _len(left):
+            less, greater = self._split(left, i)
+            return less, self.Node.join(greater, node, right)
+        less, greater = self._split(right, i - _len(left) - 1)
+        return self.Node.join(left, node, less), greater
+
+    def _index(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError
+        return i
+
+    def _node(self, i):
+        i, node = self._index(i), self._root
+        while True:
+            smaller = _len(node.left)
+            if i == smaller:
+                return node
+            if i < smaller:
+                node = node.left
+            else:
+                i -= smaller + 1
+                node = node.right
+
+    def __len__(self):
+        return _len(self._root)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            if step == 1:
+                return type(self)(self._iterfrom(start, stop - start))
+            return type(self)(list(self)[i])
+        return self._node(i).value
+
+    def __setitem__(self, i, item):
+        self._node(i).value = item
+
+    def __delitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            if step != 1:
+                items = list(self)
+                del items[i]
+                self._root = self._build(items, 0, len(items))
+                return
+        else:
+            start = self._index(i)
+            stop = start + 1
+        less, rest = self._split(self._root, start)
+        middle, greater = self._split(rest, max(0, stop - start))
+        self._root = self.Node.join2(less, greater)
+
+    def insert(self, i, item):
+        # The same as list.insert, so i may be out of range.
+        n = len(self)
+        i = min(max(i + n if i < 0 else i, 0), n)
+        less, greater = self._split(self._root, i)
+        self._root = self.Node.join(less, self.Node(None, item), greater)
+
+    def append(self, item):
+        self.insert(len(self), item)
+
+    def pop(self, i = -1):
+        item = self[i]
+        del self[i]
+        return item
+
+    def split(self, i):
+        # Return the sequences of the first i items and of the rest, in
+        # O(log n).  This sequence is left empty.
+        less, greater = self._split(self._root, min(max(i, 0), len(self)))
+        self._root = None
+        return self._new(less), self._new(greater)
+
+    def join(self, other):
+        # Return the concatenation in O(log n).  Both sequences are left
+        # empty.
+        if type(other) is not type(self):
+            raise TypeError("both sequences must have the same type")
+        a, b = self._root, other._root
+        self._root = other._root = None
+        return self._new(self.Node.join2(a, b))
+
+    def __add__(self, other):
+        # Unlike join, this copies both sequences.
+        return type(self)(chain(self, other))
+
+    def _iterfrom(self, i, count):
+        # Yield count items, starting from the one at index i.
+        stack, node = [], self._root
+        while node is not None:
+            smaller = _len(node.left)
+            if i <= smaller:
+                stack.append(node)
+                node = node.left
+            else:
+                i -= smaller + 1
+                node = node.right
+        while stack and count > 0:
+            node = stack.pop()
+            yield node.value
+            count -= 1
+            node = node.right
+            while node is not None:
+                stack.append(node)
+                node = node.left
+
+    def __iter__(self):
+        return self._iterfrom(0, len(self))
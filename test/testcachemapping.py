@@ -0,0 +1,148 @@
+import unittest
+from ds2.mapping import CacheMapping, LFU, TTL
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+class TestLRU(unittest.TestCase):
+    def testevictsleastrecentlyused(self):
+        C = CacheMapping(3)
+        for k in 'abc':
+            C[k] = k.upper()
+        C['a']
+        C['d'] = 'D'
+        self.assertEqual(set(C), {'a', 'c', 'd'})
+        self.assertEqual(C.evictions, 1)
+
+    def testoverwritecountsasuse(self):
+        C = CacheMapping(2)
+        C['a'] = 1
+        C['b'] = 2
+        C['a'] = 3
+        C['c'] = 4
+        self.assertEqual(set(C.items()), {('a', 3), ('c', 4)})
+
+    def testcontainsdoesnottouch(self):
+        C = CacheMapping(2)
+        C['a'] = 1
+        C['b'] = 2
+        self.assertTrue('a' in C)
+        C['c'] = 3
+        self.assertTrue('a' not in C)
+        self.assertEqual(C.hits + C.misses, 0)
+
+class TestLFU(unittest.TestCase):
+    def testevictsleastfrequentlyused(self):
+        C = CacheMapping(3, policy = LFU())
+        for k in 'abc':
+            C[k] = k
+        for i in range(3):
+            C['a']
+        C['b']
+        C['d'] = 'd'
+        self.assertEqual(set(C), {'a', 'b', 'd'})
+        C['e'] = 'e'
+        self.assertEqual(set(C), {'a', 'b', 'e'})
+
+    def testtiesbrokenbyrecency(self):
+        C = CacheMapping(2, policy = LFU())
+        C['a'] = 1
+        C['b'] = 2
+        C['b']
+        C['a']
+        C['c'] = 3
+        self.assertEqual(set(C), {'a', 'c'})
+
+    def testremove(self):
+        C = CacheMapping(3, policy = LFU())
+        for k in 'abc':
+            C[k] = k
+        C['a']
+        del C['a']
+        C['b']
+        C['d'] = 'd'
+        C['e'] = 'e'
+        self.assertEqual(len(C), 3)
+        self.assertTrue('b' in C)
+
+class TestTTL(unittest.TestCase):
+    def testexpiry(self):
+        clock = FakeClock()
+        C = CacheMapping(10, policy = TTL(5, clock))
+        C['a'] = 1
+        clock.now = 3
+        C['b'] = 2
+        self.assertEqual(C['a'], 1)
+        clock.now = 5
+        with self.assertRaises(KeyError):
+            C['a']
+        self.assertEqual(C['b'], 2)
+        self.assertEqual(C.expirations, 1)
+        clock.now = 8
+        self.assertEqual(len(C), 0)
+        self.assertEqual(C.expirations, 2)
+
+    def testoverwriteresetsexpiry(self):
+        clock = FakeClock()
+        C = CacheMapping(10, policy = TTL(5, clock))
+        C['a'] = 1
+        C['b'] = 2
+        clock.now = 4
+        C['a'] = 3
+        clock.now = 6
+        self.assertEqual(list(C.items()), [('a', 3)])
+
+    def testremoveexpired(self):
+        clock = FakeClock()
+        C = CacheMapping(10, policy = TTL(5, clock))
+        C['a'] = 1
+        clock.now = 5
+        with self.assertRaises(KeyError):
+            del C['a']
+        self.assertEqual(C.expirations, 1)
+        self.assertEqual(len(C), 0)
+
+    def testcapacitystillapplies(self):
+        C = CacheMapping(2, policy = TTL(100, FakeClock()))
+        for k in 'abc':
+            C[k] = k
+        self.assertEqual(set(C), {'b', 'c'})
+
+class TestCacheMapping(unittest.TestCase):
+    def testsizeof(self):
+        C = CacheMapping(10, sizeof = len)
+        C['a'] = b'1234'
+        C['b'] = b'1234'
+        C['c'] = b'12'
+        self.assertEqual(len(C), 3)
+        C['a'] = b'12345'
+        self.assertEqual(set(C), {'a', 'c'})
+        C['d'] = b'12345678901'
+        self.assertTrue('d' not in C)
+        # A value too big to fit does not push anything else out.
+        self.assertEqual(set(C), {'a', 'c'})
+        self.assertEqual(C.evictions, 1)
+        C['a'] = b'12345678901'
+        self.assertEqual(set(C), {'c'})
+        self.assertEqual(C.evictions, 1)
+
+    def teststats(self):
+        C = CacheMapping(2)
+        C['a'] = 1
+        C['b'] = 2
+        C['c'] = 3
+        C['b']
+        with self.assertRaises(KeyError):
+            C['a']
+        stats = C.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['evictions'], 1)
+        self.assertEqual(stats['size'], 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -70,6 +70,16 @@ class TestDoublyLinkedList(unittest.TestCase, DequeTests):
         self.assertEqual(C.removefirst(), 1)
         self.assertEqual(C.removefirst(), 2)
 
+    def testremovemiddlenode(self):
+        D = self.Deque()
+        D.addlast(1)
+        node = D.addlast(2)
+        D.addlast(3)
+        self.assertEqual(D._remove(node), 2)
+        self.assertEqual(len(D), 2)
+        self.assertEqual(D.removefirst(), 1)
+        self.assertEqual(D.removefirst(), 3)
+
     def testconcatempty(self):
         A = self.Deque()
         C = self.Deque()
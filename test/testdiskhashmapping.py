@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+from ds2.mapping import DiskHashMapping
+
+class TestDiskHashMapping(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._dir.name, 'table')
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def testgetandput(self):
+        with DiskHashMapping(self.path) as M:
+            M[b'one'] = b'1'
+            M[b'two'] = b'2'
+            M[b'one'] = b'uno'
+            self.assertEqual(M[b'one'], b'uno')
+            self.assertEqual(M[b'two'], b'2')
+            self.assertEqual(len(M), 2)
+            self.assertTrue(b'three' not in M)
+            with self.assertRaises(KeyError):
+                M[b'three']
+
+    def testpersistence(self):
+        with DiskHashMapping(self.path, keysize = 8, valuesize = 4) as M:
+            for i in range(100):
+                M[b'k%d' % i] = b'%d' % i
+            M.flush()
+        with DiskHashMapping(self.path) as M:
+            self.assertEqual(len(M), 100)
+            self.assertEqual(M[b'k42'], b'42')
+            self.assertEqual(set(M), {b'k%d' % i for i in range(100)})
+
+    def testgrowth(self):
+        with DiskHashMapping(self.path, size = 4) as M:
+            for i in range(1000):
+                M[b'%d' % i] = b'%d' % (i * i)
+            self.assertEqual(len(M), 1000)
+            for i in range(1000):
+                self.assertEqual(M[b'%d' % i], b'%d' % (i * i))
+
+    def testremove(self):
+        with DiskHashMapping(self.path, size = 8) as M:
+            for rounds in range(10):
+                for i in range(20):
+                    M[b'%d' % i] = b'x'
+                for i in range(20):
+                    del M[b'%d' % i]
+            self.assertEqual(len(M), 0)
+            M[b'a'] = b'b'
+            with self.assertRaises(KeyError):
+                M.remove(b'c')
+            self.assertEqual(list(M.items()), [(b'a', b'b')])
+
+    def testrecordwidth(self):
+        with DiskHashMapping(self.path, keysize = 4, valuesize = 4) as M:
+            M[b'1234'] = b''
+            with self.assertRaises(ValueError):
+                M[b'12345'] = b''
+            with self.assertRaises(ValueError):
+                M[b'1'] = b'12345'
+            with self.assertRaises(TypeError):
+                M['1'] = b'1'
+        with self.assertRaises(ValueError):
+            DiskHashMapping(self.path, keysize = 8)
+
+    def testwidthlimit(self):
+        # Lengths are stored in two bytes, so wider fields are refused.
+        with self.assertRaises(ValueError):
+            DiskHashMapping(self.path, valuesize = 70000)
+        self.assertFalse(os.path.exists(self.path))
+        with DiskHashMapping(self.path, valuesize = 65535) as M:
+            M[b'k'] = b'v' * 65535
+            self.assertEqual(M[b'k'], b'v' * 65535)
+            self.assertEqual(len(M), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,4 @@
+import threading
 import unittest
 from ds2.mapping import (Mapping,
                         ListMappingSimple,
@@ -6,12 +7,22 @@ from ds2.mapping import (Mapping,
                         HashMappingSimple,
                         HashMapping_notDRY,
                         HashMapping,
+                        OpenAddressMapping,
+                        IncrementalHashMapping,
+                        CacheMapping,
+                        ConcurrentHashMapping,
+                        CuckooMapping,
                         )
 from ds2.orderedmapping import (BSTMapping,
                                 BalancedBST,
                                 WBTree,
                                 AVLTree,
-                                SplayTree
+                                SplayTree,
+                                BPlusTree,
+                                PersistentAVLTree,
+                                instrumented,
+                                SkipList,
+                                ArrayAVLTree,
                                 )
 
 class MappingTests:
@@ -103,33 +114,243 @@ class ExtendedMappingTests:
             M[i] = 1
         self.assertEqual(len(M), 900)
 
+    def testhashcollisions(self):
+        M = self.Mapping()
+        # In CPython, -1 and -2 have the same hash.
+        M[-1] = 'a'
+        M[-2] = 'b'
+        self.assertEqual(M[-1], 'a')
+        self.assertEqual(M[-2], 'b')
+        self.assertEqual(len(M), 2)
+
     def teststr(self):
         M = self.Mapping()
         M[1] = 2
         self.assertEqual(str(M), '{1 : 2}')
 
-def _test(mapping, extended=True):
+class RemovalMappingTests:
+    def testremove(self):
+        M = self.Mapping()
+        for i in range(100):
+            M[i] = i
+        for i in range(0, 100, 2):
+            M.remove(i)
+        self.assertEqual(len(M), 50)
+        self.assertEqual(sorted(M), list(range(1, 100, 2)))
+        self.assertTrue(2 not in M)
+        self.assertTrue(3 in M)
+        with self.assertRaises(KeyError):
+            M.get(4)
+
+    def testremoveraisesKeyError(self):
+        M = self.Mapping()
+        with self.assertRaises(KeyError):
+            M.remove(1)
+        M[1] = 'one'
+        M.remove(1)
+        with self.assertRaises(KeyError):
+            M.remove(1)
+
+    def testdelitem(self):
+        M = self.Mapping()
+        M['a'] = 1
+        M['b'] = 2
+        del M['a']
+        self.assertEqual(list(M.items()), [('b', 2)])
+
+    def testremoveallandrefill(self):
+        M = self.Mapping()
+        for i in range(500):
+            M[i] = i
+        for i in range(500):
+            del M[i]
+        self.assertEqual(len(M), 0)
+        self.assertEqual(list(M), [])
+        for i in range(20):
+            M[i] = -i
+        self.assertEqual(len(M), 20)
+        self.assertEqual(M[19], -19)
+
+class BulkMappingTests:
+    def testupdate(self):
+        M = self.Mapping()
+        M[0] = 'zero'
+        M.update([(i, i * i) for i in range(1, 200)])
+        M.update({0: 0, 200: 40000})
+        self.assertEqual(len(M), 201)
+        for i in range(201):
+            self.assertEqual(M[i], i * i)
+
+    def testupdatefromiterator(self):
+        M = self.Mapping()
+        M.update(((i, -i) for i in range(300)), sizehint = 10)
+        M.update((i, i) for i in range(200, 400))
+        self.assertEqual(len(M), 400)
+        self.assertEqual(M[100], -100)
+        self.assertEqual(M[300], 300)
+
+    def testgetmany(self):
+        M = self.Mapping()
+        for i in range(50):
+            M[i] = str(i)
+        self.assertEqual(M.get_many([3, 60, 3, 49]), ['3', None, '3', '49'])
+        self.assertEqual(M.get_many(iter([0, -1]), 'x'), ['0', 'x'])
+        self.assertEqual(M.get_many([]), [])
+
+    def testcontainsmany(self):
+        M = self.Mapping()
+        M['a'] = None
+        M['b'] = 0
+        self.assertEqual(M.contains_many(['a', 'b', 'c']), [True, True, False])
+
+    def testfromitems(self):
+        M = self.Mapping.from_items([('a', 1), ('b', 2), ('a', 3)])
+        self.assertTrue(isinstance(M, self.Mapping))
+        self.assertEqual(len(M), 2)
+        self.assertEqual(M['a'], 3)
+        self.assertEqual(M['b'], 2)
+
+def _test(mapping, extended=True, removal=False):
     """ Produce a TestCase class that uses the given implementation.
     """
+    bases = [unittest.TestCase, MappingTests]
     if extended:
-        class MappingTestCase(unittest.TestCase, MappingTests, ExtendedMappingTests):
-            Mapping = mapping
-    else:
-        class MappingTestCase(unittest.TestCase, MappingTests):
-            Mapping = mapping
+        bases.append(ExtendedMappingTests)
+    if removal:
+        bases.append(RemovalMappingTests)
+        bases.append(BulkMappingTests)
+    class MappingTestCase(*bases):
+        Mapping = mapping
     return MappingTestCase
 
 TestListMappingSimple = _test(ListMappingSimple, extended = False)
 TestHashMappingSimple = _test(HashMappingSimple, extended = False)
-TestListMapping = _test(ListMapping)
+TestListMapping = _test(ListMapping, removal = True)
 TestListMapping_notDRY = _test(ListMapping_notDRY)
-TestHashMapping = _test(HashMapping)
 TestHashMapping_notDRY = _test(HashMapping_notDRY)
-TestBSTMapping = _test(BSTMapping)
-TestBalancedBST = _test(BalancedBST)
-TestWBTree = _test(WBTree)
-TestAVLTree = _test(AVLTree)
-TestSplayTree = _test(SplayTree)
+TestOpenAddressMapping = _test(OpenAddressMapping, removal = True)
+TestCacheMapping = _test(CacheMapping, removal = True)
+
+class TestCuckooMapping(_test(CuckooMapping, removal = True)):
+    def testequalhashes(self):
+        class Key:
+            def __init__(self, n):
+                self.n = n
+            def __hash__(self):
+                return 7
+            def __eq__(self, other):
+                return self.n == other.n
+        M = CuckooMapping()
+        keys = [Key(i) for i in range(20)]
+        for k in keys:
+            M[k] = k.n
+        self.assertEqual(len(M), 20)
+        for k in keys:
+            self.assertEqual(M[k], k.n)
+        for k in keys[:10]:
+            del M[k]
+        self.assertEqual(sorted(M.values()), list(range(10, 20)))
+
+    def testequalhashesdonotgrowtables(self):
+        # Bigger tables cannot separate equal hashes, so only the load
+        # factor decides the size.
+        class Key:
+            def __init__(self, n):
+                self.n = n
+            def __hash__(self):
+                return 7
+            def __eq__(self, other):
+                return self.n == other.n
+        M = CuckooMapping()
+        for i in range(40):
+            M[Key(i)] = i
+        self.assertEqual(len(M), 40)
+        self.assertTrue(M._size <= 64)
+        self.assertEqual(sorted(M.values()), list(range(40)))
+
+    def testprobesarebounded(self):
+        M = CuckooMapping()
+        for i in range(5000):
+            M[i * 7919] = i
+        self.assertTrue(len(M._stash) <= M._stashlimit)
+        for i in range(5000):
+            self.assertEqual(M[i * 7919], i)
+
+class TestConcurrentHashMapping(_test(ConcurrentHashMapping, removal = True)):
+    def testthreads(self):
+        M = ConcurrentHashMapping(shards = 4, size = 2)
+        def work(t):
+            for i in range(t, 4000, 8):
+                M[i] = t
+                self.assertEqual(M[i], t)
+            for i in range(t, 4000, 16):
+                del M[i]
+        threads = [threading.Thread(target = work, args = (t,))
+                   for t in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(M), 2000)
+        self.assertEqual(sorted(M), [i for i in range(4000) if i % 16 >= 8])
+        self.assertEqual(M[9], 1)
+
+class TestHashMapping(_test(HashMapping, removal = True)):
+    def testshrink(self):
+        M = HashMapping(size = 4)
+        for i in range(1000):
+            M[i] = i
+        for i in range(995):
+            del M[i]
+        self.assertTrue(M._size < 100)
+        self.assertEqual(sorted(M), list(range(995, 1000)))
+
+    def testresizedoesnotrehash(self):
+        class Key:
+            hashcalls = 0
+            def __init__(self, n):
+                self.n = n
+            def __hash__(self):
+                Key.hashcalls += 1
+                return self.n
+            def __eq__(self, other):
+                return self.n == other.n
+        M = HashMapping(size = 2)
+        keys = [Key(i) for i in range(100)]
+        for k in keys:
+            M[k] = k.n
+        self.assertEqual(Key.hashcalls, 100)
+        self.assertEqual(M[keys[42]], 42)
+
+class TestIncrementalHashMapping(_test(IncrementalHashMapping, removal = True)):
+    def testduringresize(self):
+        M = IncrementalHashMapping(size = 4, step = 1)
+        for i in range(50):
+            M[i] = i * 10
+            self.assertEqual(len(M), i + 1)
+            self.assertEqual(sorted(M), list(range(i + 1)))
+            for j in range(i + 1):
+                self.assertEqual(M[j], j * 10)
+
+    def testoverwriteduringresize(self):
+        M = IncrementalHashMapping(size = 4, step = 1)
+        for i in range(10):
+            M[i] = 'old'
+        for i in range(10):
+            M[i] = 'new'
+        self.assertEqual(len(M), 10)
+        self.assertEqual(set(M.values()), {'new'})
+
+TestBSTMapping = _test(BSTMapping, removal = True)
+TestBalancedBST = _test(BalancedBST, removal = True)
+TestWBTree = _test(WBTree, removal = True)
+TestAVLTree = _test(AVLTree, removal = True)
+TestSplayTree = _test(SplayTree, removal = True)
+TestBPlusTree = _test(BPlusTree, removal = True)
+TestPersistentAVLTree = _test(PersistentAVLTree, removal = True)
+TestInstrumentedSplayTree = _test(instrumented(SplayTree), removal = True)
+TestSkipList = _test(SkipList, removal = True)
+TestArrayAVLTree = _test(ArrayAVLTree, removal = True)
 
 class TestAbstractMapping(unittest.TestCase):
     """ These tests just check (and document) the methods that must
@@ -156,5 +377,10 @@ class TestAbstractMapping(unittest.TestCase):
         with self.assertRaises(NotImplementedError):
             M._entryiter()
 
+    def testmustimplementremove(self):
+        M = Mapping()
+        with self.assertRaises(NotImplementedError):
+            del M[1]
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,9 +1,26 @@
+import threading
 import unittest
+from ds2.orderedmapping.avltree import height
 from ds2.orderedmapping import (BSTMapping,
                                 BalancedBST,
                                 WBTree,
                                 AVLTree,
-                                SplayTree
+                                SplayTree,
+                                BPlusTree,
+                                PersistentAVLTree,
+                                instrumented,
+                                EytzingerMapping,
+                                augmented,
+                                Monoid,
+                                SUM,
+                                COUNT,
+                                MIN,
+                                MAX,
+                                IntervalTree,
+                                SkipList,
+                                ArrayAVLTree,
+                                WBTreeNode,
+                                AVLTreeNode,
                                 )
 
 class OrderedMappingTests:
@@ -45,18 +62,739 @@ class OrderedMappingTests:
             M[i] = None
         self.assertEqual(list(M), [1,2,3,4,6,9])
 
-def _test(orderedmapping):
+    def testceiling(self):
+        M = self.OrderedMapping()
+        for i in [2, 6, 4, 8]:
+            M[i] = i * 10
+        self.assertEqual(M.ceiling(4), (4, 40))
+        self.assertEqual(M.ceiling(5), (6, 60))
+        self.assertEqual(M.ceiling(1), (2, 20))
+        self.assertEqual(M.ceiling(9), (None, None))
+        self.assertEqual(self.OrderedMapping().ceiling(1), (None, None))
+
+    def testpredecessorsuccessor(self):
+        M = self.OrderedMapping()
+        for i in [2, 6, 4, 8]:
+            M[i] = i * 10
+        self.assertEqual(M.predecessor(4), (2, 20))
+        self.assertEqual(M.predecessor(5), (4, 40))
+        self.assertEqual(M.predecessor(2), (None, None))
+        self.assertEqual(M.successor(4), (6, 60))
+        self.assertEqual(M.successor(5), (6, 60))
+        self.assertEqual(M.successor(8), (None, None))
+
+    def testrange(self):
+        M = self.OrderedMapping()
+        for k in [(i * 7) % 50 for i in range(50)]:
+            M[k] = -k
+        self.assertEqual(list(M.range(10, 15)),
+                         [(k, -k) for k in range(10, 15)])
+        self.assertEqual(list(M.range(-5, 3)), [(0, 0), (1, -1), (2, -2)])
+        self.assertEqual(list(M.range(48, 100)), [(48, -48), (49, -49)])
+        self.assertEqual(list(M.range(20, 20)), [])
+        self.assertEqual(list(self.OrderedMapping().range(0, 10)), [])
+
+    def testrangeislazy(self):
+        M = self.OrderedMapping()
+        for i in range(20):
+            M[i] = i
+        r = M.range(5, 15)
+        self.assertEqual(next(r), (5, 5))
+        self.assertEqual(next(r), (6, 6))
+
+class CursorTests:
+    def testcursor(self):
+        M = self.OrderedMapping()
+        for i in [5, 1, 9, 3, 7]:
+            M[i] = str(i)
+        c = M.cursor(4)
+        self.assertEqual(c.next(), (5, '5'))
+        self.assertEqual(c.next(), (7, '7'))
+        self.assertEqual(c.prev(), (7, '7'))
+        self.assertEqual(c.prev(), (5, '5'))
+        self.assertEqual(c.prev(), (3, '3'))
+        self.assertEqual(c.prev(), (1, '1'))
+        self.assertFalse(c.hasprev())
+        with self.assertRaises(StopIteration):
+            c.prev()
+        self.assertEqual(c.next(), (1, '1'))
+        c.seek(7)
+        self.assertEqual(list(c), [(7, '7'), (9, '9')])
+        self.assertFalse(c.hasnext())
+        self.assertEqual(c.prev(), (9, '9'))
+        c.seekend()
+        self.assertEqual(c.prev(), (9, '9'))
+        self.assertEqual(list(M.cursor(10)), [])
+        self.assertEqual(list(M.cursor()), [(1, '1'), (3, '3'), (5, '5'),
+                                            (7, '7'), (9, '9')])
+
+    def testcursoronempty(self):
+        c = self.OrderedMapping().cursor()
+        self.assertFalse(c.hasnext())
+        self.assertFalse(c.hasprev())
+        with self.assertRaises(StopIteration):
+            c.prev()
+        self.assertEqual(list(c), [])
+
+    def testreversed(self):
+        M = self.OrderedMapping()
+        for i in [9,1,2,6,3,4]:
+            M[i] = None
+        self.assertEqual(list(reversed(M)), [9,6,4,3,2,1])
+        self.assertEqual(list(reversed(self.OrderedMapping())), [])
+
+class OrderStatisticTests:
+    def testrankselect(self):
+        M = self.OrderedMapping()
+        keys = [(i * 7) % 50 for i in range(50)]
+        for k in keys:
+            M[k * 2] = k
+        for i in range(50):
+            self.assertEqual(M.rank(2 * i), i)
+            self.assertEqual(M.rank(2 * i + 1), i + 1)
+            self.assertEqual(M.select(i), (2 * i, i))
+        self.assertEqual(M.select(-1), (98, 49))
+        with self.assertRaises(IndexError):
+            M.select(50)
+        with self.assertRaises(IndexError):
+            self.OrderedMapping().select(0)
+        self.assertEqual(self.OrderedMapping().rank(5), 0)
+
+    def testcountrange(self):
+        M = self.OrderedMapping()
+        for k in [(i * 7) % 50 for i in range(50)]:
+            M[k] = -k
+        self.assertEqual(M.count_range(10, 15), 5)
+        self.assertEqual(M.count_range(-5, 100), 50)
+        self.assertEqual(M.count_range(15, 10), 0)
+
+class TreeChecks:
+    def checktree(self, M):
+        return self.checknode(M._root)
+
+    def checknode(self, node):
+        # Return the length and height of the subtree, checking the stored
+        # fields along the way.
+        if node is None:
+            return 0, -1
+        leftlength, leftheight = self.checknode(node.left)
+        rightlength, rightheight = self.checknode(node.right)
+        self.assertEqual(len(node), 1 + leftlength + rightlength)
+        height = 1 + max(leftheight, rightheight)
+        if isinstance(node, AVLTreeNode):
+            self.assertEqual(node.height, height)
+            self.assertLessEqual(abs(leftheight - rightheight), 1)
+        if isinstance(node, WBTreeNode):
+            self.assertFalse(node.toolight(node.left))
+            self.assertFalse(node.toolight(node.right))
+        return len(node), height
+
+class BulkLoadTests(TreeChecks):
+    def testfromsorted(self):
+        for n in [0, 1, 2, 3, 7, 100, 1000]:
+            M = self.OrderedMapping.from_sorted((i, -i) for i in range(n))
+            self.assertEqual(len(M), n)
+            self.assertEqual(list(M.items()), [(i, -i) for i in range(n)])
+            length, height = self.checktree(M)
+            self.assertEqual(height, n.bit_length() - 1)
+
+    def testfromsortedrejectsunsorted(self):
+        with self.assertRaises(ValueError):
+            self.OrderedMapping.from_sorted([(1, 1), (3, 3), (2, 2)])
+        with self.assertRaises(ValueError):
+            self.OrderedMapping.from_sorted([(1, 1), (1, 2)])
+
+    def testfromitemssorted(self):
+        M = self.OrderedMapping.from_items({i: str(i) for i in range(500)})
+        self.checktree(M)
+        self.assertEqual(M[250], '250')
+        M[1000] = 'x'
+        M.remove(0)
+        self.assertEqual(len(M), 500)
+        self.checktree(M)
+
+    def testupdateunsorted(self):
+        M = self.OrderedMapping.from_items([(3, 'c'), (1, 'a'), (2, 'b')])
+        self.assertEqual(list(M.items()), [(1, 'a'), (2, 'b'), (3, 'c')])
+        M.update([(4, 'd'), (5, 'e')])
+        self.assertEqual(list(M), [1, 2, 3, 4, 5])
+
+class SetOperationTests(TreeChecks):
+    def build(self, keys, value):
+        M = self.OrderedMapping()
+        for k in keys:
+            M[k] = value
+        return M
+
+    def testsplit(self):
+        keys = [(i * 37) % 1000 for i in range(0, 1000, 3)]
+        for key in [-1, 0, 333, 500, 501, 2000]:
+            M = self.build(keys, None)
+            less, greater = M.split(key)
+            self.assertEqual(len(M), 0)
+            self.assertEqual(list(less), sorted(k for k in keys if k < key))
+            self.assertEqual(list(greater), sorted(k for k in keys if k >= key))
+            self.checktree(less)
+            self.checktree(greater)
+
+    def testjoin(self):
+        small = self.build(range(10), 'a')
+        big = self.build(range(100, 1100), 'b')
+        M = small.join(big)
+        self.assertEqual(len(small) + len(big), 0)
+        self.assertEqual(list(M), list(range(10)) + list(range(100, 1100)))
+        self.checktree(M)
+        M = self.build(range(500, 1000), 'a').join(self.build([2000], 'b'))
+        self.assertEqual(len(M), 501)
+        self.checktree(M)
+        with self.assertRaises(ValueError):
+            self.build([5], 'a').join(self.build([1, 7], 'b'))
+
+    def testsetoperations(self):
+        A = set(range(0, 3000, 2))
+        B = set(range(0, 3000, 3))
+        M = self.build(A, 'a').union(self.build(B, 'b'))
+        expected = dict.fromkeys(A, 'a')
+        expected.update(dict.fromkeys(B, 'b'))
+        self.assertEqual(list(M.items()), sorted(expected.items()))
+        self.checktree(M)
+
+        M = self.build(A, 'a').intersection(self.build(B, 'b'))
+        self.assertEqual(list(M.items()), [(k, 'a') for k in sorted(A & B)])
+        self.checktree(M)
+
+        M = self.build(A, 'a').difference(self.build(B, 'b'))
+        self.assertEqual(list(M.items()), [(k, 'a') for k in sorted(A - B)])
+        self.checktree(M)
+
+    def testsetoperationswithempty(self):
+        E = self.OrderedMapping
+        self.assertEqual(list(self.build([1, 2], 'a').union(E())), [1, 2])
+        self.assertEqual(list(E().union(self.build([1, 2], 'a'))), [1, 2])
+        self.assertEqual(len(self.build([1, 2], 'a').intersection(E())), 0)
+        self.assertEqual(list(self.build([1, 2], 'a').difference(E())), [1, 2])
+        self.assertEqual(len(E().difference(self.build([1, 2], 'a'))), 0)
+
+    def testsortedkeysdonotrecurse(self):
+        # Sorted puts would make an unbalanced tree deeper than the
+        # recursion limit.
+        n = 3000
+        M = self.build(range(n), 'a')
+        less, greater = M.split(n // 2)
+        self.assertEqual(list(less), list(range(n // 2)))
+        M = less.join(greater)
+        M = M.union(self.build(range(n, 2 * n), 'b'))
+        self.assertEqual(list(M), list(range(2 * n)))
+        M = M.difference(self.build(range(0, 2 * n, 2), 'b'))
+        self.assertEqual(list(M), list(range(1, 2 * n, 2)))
+        self.checktree(M)
+
+    def testsetoperationsneedsametype(self):
+        other = BSTMapping()
+        other[1] = 1
+        with self.assertRaises(TypeError):
+            self.build([1], 'a').union(other)
+
+class DeepTreeTests:
+    def testsortedinsertsdonotrecurse(self):
+        # An unbalanced BST becomes a path, deeper than the recursion limit.
+        n = 2000
+        M = self.OrderedMapping()
+        for i in range(n):
+            M[i] = i
+        self.assertEqual(len(M), n)
+        self.assertEqual(M[n - 1], n - 1)
+        self.assertEqual(M.floor(n + 10), (n - 1, n - 1))
+        self.assertEqual(list(M), list(range(n)))
+        for i in range(0, n, 2):
+            M.remove(i)
+        self.assertEqual(list(M), list(range(1, n, 2)))
+
+def _test(orderedmapping, orderstatistics=True, cursors=True):
     """ Produce a TestCase class that uses the given implementation.
     """
-    class OrderedMappingTestCase(unittest.TestCase, OrderedMappingTests):
+    bases = [unittest.TestCase, OrderedMappingTests]
+    if orderstatistics:
+        bases.append(OrderStatisticTests)
+    if cursors:
+        bases.append(CursorTests)
+    class OrderedMappingTestCase(*bases):
         OrderedMapping = orderedmapping
     return OrderedMappingTestCase
 
-TestBSTMapping = _test(BSTMapping)
-TestBalancedBST = _test(BalancedBST)
-TestWBTree = _test(WBTree)
-TestAVLTree = _test(AVLTree)
-TestSplayTree = _test(SplayTree)
+class TestBSTMapping(_test(BSTMapping), DeepTreeTests):
+    pass
+
+class TestBalancedBST(_test(BalancedBST), BulkLoadTests):
+    def testnosetoperations(self):
+        # These trees can be too deep for the recursive joins and splits.
+        for cls in [BalancedBST, SplayTree]:
+            for name in ['split', 'join', 'union', 'intersection',
+                         'difference']:
+                self.assertFalse(hasattr(cls, name))
+                self.assertFalse(hasattr(cls.Node, name))
+
+class TestWBTree(_test(WBTree), DeepTreeTests, BulkLoadTests,
+                 SetOperationTests):
+    pass
+
+class TestAVLTree(_test(AVLTree), DeepTreeTests, BulkLoadTests,
+                  SetOperationTests):
+    def testheight(self):
+        M = self.OrderedMapping()
+        for i in range(1023):
+            M[i] = i
+        self.assertEqual(M._root.height, 9)
+
+class TestSplayTree(_test(SplayTree), DeepTreeTests, TreeChecks):
+    def testgetsplays(self):
+        M = self.OrderedMapping()
+        for i in range(100):
+            M[i] = i
+        M[37]
+        self.assertEqual(M._root.key, 37)
+        self.assertEqual(len(M._root), 100)
+
+    def testmisssplays(self):
+        M = self.OrderedMapping()
+        for i in range(0, 100, 2):
+            M[i] = i
+        M[0]
+        self.assertNotIn(51, M)
+        self.assertIn(M._root.key, (50, 52))
+        with self.assertRaises(KeyError):
+            M[71]
+        self.assertIn(M._root.key, (70, 72))
+
+    def testsplaykeepslengths(self):
+        M = self.OrderedMapping()
+        M[3] = 3
+        M[5] = 5
+        self.assertNotIn(1, M)
+        self.assertEqual(len(M), 2)
+        self.assertEqual(M.rank(10), 2)
+        self.checktree(M)
+        for i in range(0, 100, 7):
+            M[i] = i
+        for key in [50, 51, 0, 99, -1, 14, 3]:
+            if key in M:
+                M[key]
+            self.assertEqual(len(M), 17)
+            self.checktree(M)
+        M.floor(60)
+        M.remove(14)
+        self.assertEqual(len(M), 16)
+        self.checktree(M)
+
+    def testfloorsplays(self):
+        M = self.OrderedMapping()
+        for i in range(0, 100, 2):
+            M[i] = i
+        self.assertEqual(M.floor(51), (50, 50))
+        self.assertEqual(M._root.key, 50)
+        self.assertEqual(M.floor(-1), (None, None))
+
+class SmallBPlusTree(BPlusTree):
+    def __init__(self):
+        BPlusTree.__init__(self, order = 3)
+
+class TestBPlusTree(_test(BPlusTree, orderstatistics = False,
+                          cursors = False), DeepTreeTests):
+    def testsmallorder(self):
+        # With tiny nodes, every split, borrow and merge case comes up.
+        M = SmallBPlusTree()
+        keys = [(i * 37) % 500 for i in range(500)]
+        for k in keys:
+            M[k] = -k
+        self.assertEqual(list(M), list(range(500)))
+        for k in range(500):
+            self.assertEqual(M.floor(k + 0.5), (k, -k))
+        for k in keys[::3]:
+            M.remove(k)
+        remaining = sorted(set(keys) - set(keys[::3]))
+        self.assertEqual(list(M), remaining)
+        self.assertEqual(len(M), len(remaining))
+        for k in remaining:
+            self.assertEqual(M[k], -k)
+            M.remove(k)
+        self.assertEqual(len(M), 0)
+        self.assertEqual(list(M.items()), [])
+        M[1] = 1
+        self.assertEqual(list(M.items()), [(1, 1)])
+
+    def testorder(self):
+        with self.assertRaises(ValueError):
+            BPlusTree(2)
+
+TestSmallBPlusTree = _test(SmallBPlusTree, orderstatistics = False,
+                           cursors = False)
+
+class TestSkipList(_test(SkipList, orderstatistics = False, cursors = False),
+                   DeepTreeTests):
+    def testreadersduringwrites(self):
+        # The even keys never change, so every reader must always see all
+        # of them in order, whatever the writer is doing to the odd keys.
+        M = SkipList()
+        for i in range(0, 2000, 2):
+            M[i] = i
+        done = threading.Event()
+        errors = []
+        def read():
+            while not done.is_set():
+                keys = [k for k in M if k % 2 == 0]
+                if keys != list(range(0, 2000, 2)):
+                    errors.append(keys)
+                floor = M.floor(1001)
+                if floor not in [(1000, 1000), (1001, 1001)]:
+                    errors.append(floor)
+        readers = [threading.Thread(target = read) for i in range(4)]
+        for reader in readers:
+            reader.start()
+        for repeat in range(3):
+            for i in range(1, 2000, 2):
+                M[i] = i
+            for i in range(1, 2000, 2):
+                del M[i]
+        done.set()
+        for reader in readers:
+            reader.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(M), 1000)
+
+class TestArrayAVLTree(_test(ArrayAVLTree), DeepTreeTests, BulkLoadTests,
+                       SetOperationTests):
+    def checktree(self, M):
+        # Return the length and height, checking the stored fields and the
+        # free list along the way.
+        def check(i):
+            if not i:
+                return 0, -1
+            leftlength, leftheight = check(M._left[i])
+            rightlength, rightheight = check(M._right[i])
+            self.assertLessEqual(abs(leftheight - rightheight), 1)
+            self.assertEqual(M._height[i], 2 + max(leftheight, rightheight))
+            self.assertEqual(M._length[i], 1 + leftlength + rightlength)
+            return M._length[i], M._height[i] - 1
+        length, height = check(M._root)
+        free, i = 0, M._free
+        while i:
+            free, i = free + 1, M._left[i]
+        self.assertEqual(length + free, len(M._keys) - 1)
+        return length, height
+
+    def testbalanced(self):
+        M = ArrayAVLTree()
+        for i in range(1000):
+            M[i] = i
+        self.checktree(M)
+        for i in range(0, 1000, 3):
+            M.remove(i)
+        self.checktree(M)
+        self.assertEqual(list(reversed(M)), [i for i in range(999, 0, -1)
+                                             if i % 3])
+
+    def testfreeslots(self):
+        # Removed slots are used again before the arrays grow.
+        M = ArrayAVLTree()
+        for i in range(100):
+            M[i] = i
+        for i in range(50):
+            del M[i]
+        self.assertEqual(len(M), 50)
+        for i in range(100, 150):
+            M[i] = i
+        self.assertEqual(len(M._keys), 101)
+        self.assertEqual(list(M), list(range(50, 150)))
+        self.checktree(M)
+
+def nodes(node):
+    return [] if node is None else [node] + nodes(node.left) + nodes(node.right)
+
+class TestPersistentAVLTree(_test(PersistentAVLTree), DeepTreeTests):
+    def testsnapshot(self):
+        M = self.OrderedMapping()
+        for i in range(100):
+            M[i] = i
+        S = M.snapshot()
+        for i in range(0, 100, 2):
+            M.remove(i)
+        M[5] = 'five'
+        M[200] = 200
+        self.assertEqual(list(S.items()), [(i, i) for i in range(100)])
+        self.assertEqual(len(M), 51)
+        self.assertEqual(M[5], 'five')
+        S[0] = 'zero'
+        self.assertEqual(M.get_many([0, 1]), [None, 1])
+        self.assertEqual(S[0], 'zero')
+
+    def testpathcopying(self):
+        M = self.OrderedMapping()
+        for i in range(1000):
+            M[i] = i
+        S = M.snapshot()
+        M[500.5] = None
+        old = set(map(id, nodes(S._root)))
+        new = [n for n in nodes(M._root) if id(n) not in old]
+        self.assertLessEqual(len(new), 2 * M._root.height)
+
+    def testheights(self):
+        M = self.OrderedMapping()
+        for i in range(1000):
+            M[(i * 37) % 1000] = i
+        for i in range(0, 1000, 3):
+            M.remove(i)
+        for n in nodes(M._root):
+            self.assertLessEqual(abs(height(n.left) - height(n.right)), 1)
+            self.assertEqual(n.height, 1 + max(height(n.left), height(n.right)))
+
+class InstrumentedTests:
+    def teststats(self):
+        M = self.OrderedMapping()
+        for i in range(100):
+            M[i] = i
+        M[5]
+        self.assertNotIn(200, M)
+        M.remove(3)
+        stats = M.stats()
+        self.assertEqual(stats['puts'], 100)
+        self.assertEqual(stats['gets'], 2)
+        self.assertEqual(stats['removes'], 1)
+        self.assertEqual(stats['length'], 99)
+        self.assertGreater(stats['rotations'], 0)
+        self.assertGreaterEqual(stats['comparisons'], stats['nodes_visited'])
+        self.assertGreater(stats['average_path'], 1)
+
+    def testhook(self):
+        class Hook:
+            def __init__(self):
+                self.calls = []
+            def rotation(self):
+                self.calls.append('rotation')
+            def search(self, visited, comparisons):
+                self.calls.append(('search', visited))
+            def operation(self, name, rotations):
+                self.calls.append((name, rotations))
+        hook = Hook()
+        M = self.OrderedMapping(hook)
+        for i in range(3):
+            M[i] = i
+        puts = [c for c in hook.calls if c[0] == 'put']
+        self.assertEqual(len(puts), 3)
+        self.assertEqual(hook.calls.count('rotation'),
+                         sum(rotations for name, rotations in puts))
+        self.assertEqual(hook.calls[0][0], 'search')
+        self.assertEqual(hook.calls[1], ('put', 0))
+        self.assertEqual(M.stats()['length'], 3)
+
+    def testcountsrealwork(self):
+        M = self.OrderedMapping()
+        for i in range(100):
+            M[i] = i
+        def visits(operation, *args):
+            before = M.stats()['nodes_visited']
+            result = operation(*args)
+            if hasattr(result, '__next__'):
+                result = list(result)
+            return M.stats()['nodes_visited'] - before, result
+        # The root has two children, so remove walks on from it.
+        root = M._root.key
+        self.assertEqual(visits(M.get, root), (1, root))
+        self.assertGreater(visits(M.remove, root)[0], 1)
+        self.assertGreater(visits(M.floor, 50.5)[0], 0)
+        self.assertGreaterEqual(visits(M.range, 10, 20)[0], 10)
+        stats = M.stats()
+        self.assertEqual(stats['queries'], 2)
+        self.assertEqual(stats['removes'], 1)
+        # A walk that is stopped early is still reported.
+        walk = M.range(10, 20)
+        next(walk)
+        walk.close()
+        self.assertEqual(M.stats()['queries'], 3)
+
+class TestInstrumentedAVLTree(_test(instrumented(AVLTree)), InstrumentedTests,
+                              SetOperationTests):
+    def testheight(self):
+        M = self.OrderedMapping()
+        for i in range(1023):
+            M[i] = i
+        self.assertEqual(M.stats()['height'], 9)
+        self.assertEqual(M.stats()['rotations'], 1013)
+
+    def teststatsafterunion(self):
+        # Rotations are counted for the tree doing the operation, even on
+        # nodes that came from another tree.
+        A = self.build(range(0, 200, 2), 'a')
+        B = self.build(range(1, 200, 2), 'b')
+        before = A.stats()['rotations'], B.stats()['rotations']
+        C = A.union(B)
+        for i in range(200, 400):
+            C[i] = i
+        self.assertEqual((A.stats()['rotations'], B.stats()['rotations']),
+                         before)
+        self.assertGreater(C.stats()['rotations'], 0)
+        self.assertGreater(C.stats()['rotations_per_update'], 0)
+        less, greater = C.split(300)
+        for i in range(-100, 0):
+            less[i] = i
+        self.assertGreater(less.stats()['rotations'], 0)
+        self.assertEqual(greater.stats()['rotations'], 0)
+
+class TestInstrumentedWBTree(_test(instrumented(WBTree)), InstrumentedTests):
+    pass
+
+class TestInstrumentedSplayTree(_test(instrumented(SplayTree)),
+                                InstrumentedTests):
+    def testsplayrotations(self):
+        M = self.OrderedMapping()
+        for i in range(8):
+            M[i] = i
+        # The tree is now a path, and splaying 0 does a rotation for every
+        # two levels.
+        before = M.stats()['rotations']
+        M[0]
+        self.assertEqual(M.stats()['rotations'] - before, 3)
+
+class AugmentedTests:
+    # The generic tests store values that cannot be added, so the sums
+    # are tested on a tree of their own.
+    def sums(self):
+        M = augmented(self.treeclass, total = SUM, count = COUNT, low = MIN,
+                      high = MAX)()
+        for k in [(i * 7) % 50 for i in range(50)]:
+            M[k] = k % 10
+        return M
+
+    def testaggregate(self):
+        M = self.sums()
+        values = {k: k % 10 for k in range(50)}
+        for lo, hi in [(0, 50), (10, 20), (13, 14), (14, 13), (-5, 5), (45, 99)]:
+            vs = [v for k, v in values.items() if lo <= k < hi]
+            self.assertEqual(M.aggregate(lo, hi), {
+                'total': sum(vs),
+                'count': len(vs),
+                'low': min(vs) if vs else None,
+                'high': max(vs) if vs else None,
+            })
+        self.assertEqual(M.aggregate(hi = 10, name = 'total'), 45)
+        self.assertEqual(M.aggregate(40, name = 'count'), 10)
+        self.assertEqual(M.aggregate(name = 'total'), 225)
+
+    def testaggregateafterchanges(self):
+        M = self.sums()
+        M[5] = 100
+        M.remove(6)
+        M[60] = -1
+        self.assertEqual(M.aggregate(0, 10, 'total'), 45 - 5 + 100 - 6)
+        self.assertEqual(M.aggregate(0, 10, 'high'), 100)
+        self.assertEqual(M.aggregate(name = 'low'), -1)
+        self.assertEqual(M.aggregate(name = 'count'), 50)
+        M[1]
+        M.floor(33)
+        self.assertEqual(M.aggregate(name = 'count'), 50)
+
+    def testordermatters(self):
+        # The combine function does not have to be commutative.
+        T = augmented(self.treeclass,
+                      keys = Monoid(lambda a, b: a + b, '',
+                                    lambda key, value: key))
+        M = T()
+        for c in 'thequickbrownfx':
+            M[c] = None
+        self.assertEqual(M.aggregate('c', 'p', 'keys'), 'cefhikno')
+
+class TestAugmentedAVLTree(_test(augmented(AVLTree, count = COUNT)),
+                           AugmentedTests, SetOperationTests, BulkLoadTests):
+    treeclass = AVLTree
+
+class TestAugmentedWBTree(_test(augmented(WBTree, count = COUNT)),
+                          AugmentedTests):
+    treeclass = WBTree
+
+class TestAugmentedSplayTree(_test(augmented(SplayTree, count = COUNT)),
+                             AugmentedTests):
+    treeclass = SplayTree
+
+class TestIntervalTree(unittest.TestCase):
+    def build(self):
+        T = IntervalTree()
+        for i in range(100):
+            T[(i, i + i % 7)] = i
+        return T
+
+    def testoverlapping(self):
+        T = self.build()
+        intervals = [(i, i + i % 7) for i in range(100)]
+        for start, end in [(0, 0), (10, 12), (50, 50), (-3, -1), (98, 200),
+                           (-10, 1000), (20, 19)]:
+            expected = [((a, b), a) for a, b in intervals
+                        if a <= end and start <= b]
+            self.assertEqual(list(T.overlapping(start, end)), expected)
+
+    def teststab(self):
+        T = self.build()
+        self.assertEqual([v for k, v in T.stab(20)], [17, 18, 19, 20])
+        self.assertEqual(list(T.stab(500)), [])
+
+    def testremove(self):
+        T = self.build()
+        T.remove((15, 16))
+        del T[(18, 22)]
+        T[(17, 21)] = 'new'
+        T[(19, 24)] = 'changed'
+        self.assertEqual(list(T.stab(20)),
+                         [((17, 20), 17), ((17, 21), 'new'),
+                          ((19, 24), 'changed'), ((20, 26), 20)])
+        for i in range(100):
+            if (i, i + i % 7) in T:
+                T.remove((i, i + i % 7))
+        self.assertEqual(list(T.stab(20)), [((17, 21), 'new')])
+
+    def testbadinterval(self):
+        T = IntervalTree()
+        with self.assertRaises(ValueError):
+            T[(2, 1)] = None
+        T[(1, 1)] = None
+        self.assertEqual(list(T.stab(1)), [((1, 1), None)])
+
+class TestEytzingerMapping(unittest.TestCase):
+    def testfreeze(self):
+        for cls in [BSTMapping, WBTree, AVLTree, SplayTree, PersistentAVLTree]:
+            M = cls()
+            for k in [(i * 7) % 50 for i in range(50)]:
+                M[2 * k] = k
+            F = M.freeze()
+            self.assertEqual(list(F.items()), list(M.items()))
+            self.assertEqual(len(F), 50)
+            M[1] = 'changed'
+            self.assertNotIn(1, F)
+
+    def testqueries(self):
+        for n in [0, 1, 2, 3, 6, 7, 8, 31, 100]:
+            keys = list(range(0, 2 * n, 2))
+            F = EytzingerMapping((k, -k) for k in keys)
+            self.assertEqual(list(F), keys)
+            for k in keys:
+                self.assertEqual(F[k], -k)
+                self.assertEqual(F.floor(k + 1), (k, -k))
+                self.assertEqual(F.ceiling(k - 1), (k, -k))
+                self.assertNotIn(k + 1, F)
+            self.assertEqual(F.floor(-1), (None, None))
+            self.assertEqual(F.ceiling(2 * n), (None, None))
+            self.assertEqual(list(F.range(3, 11)),
+                             [(k, -k) for k in keys if 3 <= k < 11])
+
+    def testreadonly(self):
+        F = EytzingerMapping([(1, 'a')])
+        with self.assertRaises(TypeError):
+            F[2] = 'b'
+        with self.assertRaises(TypeError):
+            del F[1]
+        with self.assertRaises(KeyError):
+            F[2]
+
+    def testunsorted(self):
+        with self.assertRaises(ValueError):
+            EytzingerMapping([(2, 'b'), (1, 'a')])
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+from ds2.sequence import TreeSequence
+from ds2.orderedmapping import WBTreeNode
+
+class SequenceTests:
+    def testinsertandindex(self):
+        S = self.Sequence()
+        L = []
+        for i in range(200):
+            j = (i * 7) % (i + 1)
+            S.insert(j, i)
+            L.insert(j, i)
+        self.assertEqual(list(S), L)
+        self.assertEqual(len(S), 200)
+        for i in range(-200, 200):
+            self.assertEqual(S[i], L[i])
+        with self.assertRaises(IndexError):
+            S[200]
+        with self.assertRaises(IndexError):
+            S[-201]
+
+    def testinsertoutofrange(self):
+        S = self.Sequence([1, 2])
+        S.insert(10, 3)
+        S.insert(-10, 0)
+        S.insert(-1, 2.5)
+        self.assertEqual(list(S), [0, 1, 2, 2.5, 3])
+
+    def testdelete(self):
+        S = self.Sequence(range(100))
+        del S[0]
+        del S[-1]
+        del S[50]
+        self.assertEqual(list(S), list(range(1, 51)) + list(range(52, 99)))
+        with self.assertRaises(IndexError):
+            del S[97]
+        self.assertEqual(S.pop(), 98)
+        self.assertEqual(S.pop(0), 1)
+
+    def testslices(self):
+        L = list(range(50))
+        S = self.Sequence(L)
+        for s in [slice(10, 20), slice(-5, None), slice(None, 3),
+                  slice(20, 10), slice(1, 40, 3), slice(None, None, -1)]:
+            self.assertEqual(list(S[s]), L[s])
+        del S[10:20]
+        del L[10:20]
+        self.assertEqual(list(S), L)
+        del S[::2]
+        del L[::2]
+        self.assertEqual(list(S), L)
+
+    def testsetitem(self):
+        S = self.Sequence('abc')
+        S[1] = 'x'
+        S[-1] = 'y'
+        self.assertEqual(list(S), ['a', 'x', 'y'])
+
+    def testsplitjoin(self):
+        S = self.Sequence(range(1000))
+        A, B = S.split(300)
+        self.assertEqual(len(S), 0)
+        self.assertEqual(list(A), list(range(300)))
+        self.assertEqual(list(B), list(range(300, 1000)))
+        C = B.join(A)
+        self.assertEqual(len(A) + len(B), 0)
+        self.assertEqual(list(C), list(range(300, 1000)) + list(range(300)))
+        self.assertEqual(C[700], 0)
+
+    def testadd(self):
+        A, B = self.Sequence([1, 2]), self.Sequence([3])
+        self.assertEqual(list(A + B), [1, 2, 3])
+        self.assertEqual(list(A), [1, 2])
+        A.append(4)
+        self.assertEqual(list(A), [1, 2, 4])
+
+    def testempty(self):
+        S = self.Sequence()
+        self.assertEqual(len(S), 0)
+        self.assertEqual(list(S), [])
+        self.assertEqual(list(S[2:5]), [])
+        with self.assertRaises(IndexError):
+            S.pop()
+
+class TestTreeSequence(unittest.TestCase, SequenceTests):
+    Sequence = TreeSequence
+
+    def testjointype(self):
+        with self.assertRaises(TypeError):
+            TreeSequence([1]).join(WBTreeSequence([2]))
+
+class WBTreeSequence(TreeSequence):
+    Node = WBTreeNode
+
+class TestWBTreeSequence(unittest.TestCase, SequenceTests):
+    Sequence = WBTreeSequence
+
+if __name__ == '__main__':
+    unittest.main()